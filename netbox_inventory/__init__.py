@@ -29,11 +29,15 @@ class NetBoxInventoryConfig(PluginConfig):
         'asset_import_create_inventoryitem_type': False,
         'asset_import_create_rack_type': False,
         'asset_import_create_tenant': False,
+        'asset_import_chunk_size': 1000,
         'asset_custom_fields_search_filters': {},
+        'asset_search_document': False,
         'asset_warranty_expire_warning_days': 90,
+        'asset_stats_cache_timeout': 0,
         'prefill_asset_name_create_inventoryitem': False,
         'prefill_asset_tag_create_inventoryitem': False,
         'audit_window': 4 * 60,  # 4 hours
+        'graphql_max_depth': 10,
     }
 
     def register_feature_views(self) -> None:
@@ -1,109 +1,73 @@
-from copy import copy
+from collections import defaultdict
+from datetime import date, timedelta
 
-from django.db.models import Count, F
+from django.db.models import Case, CharField, Count, Value, When
 
 from .choices import AssetStatusChoices
-from .models import Asset
+from .models import Asset, InventoryItemType
+from .utils import cached_asset_stats, get_plugin_setting
 
 
-def asset_counts_type_status(inventoryitem_group, assets=None):  # noqa: C901
+def asset_counts_type_status(inventoryitem_group, assets=None):
     """
     Return counts of assets based on combinations of inventoryitem type
     and status values for assets that belong to an inventoryitem group.
     Can optionally accept pre-filtered queryset with assets.
-    Return value is a list of dicts, each having keys:
+    Counts are calculated with a single query grouped by inventoryitem type and
+    status.
+    Types that belong to a child group are only included if they have assets.
+    Return value is a list of dicts sorted by manufacturer and model, each having
+    keys:
         - inventoryitem_type__manufacturer__name
         - inventoryitem_type__model
         - inventoryitem_type (ID)
-        - status
-        - label (display label of status)
-        - color (color of status)
+        - status_list: list of dicts for each status choice with keys status,
+          label, color and count
+    Result is cached if `asset_stats_cache_timeout` setting is enabled.
     """
     if assets is None:
         assets = Asset.objects.all()
-    assets = assets.filter(
-        inventoryitem_type__inventoryitem_group__in=inventoryitem_group.get_descendants(
-            include_self=True
-        )
-    )
-    # generate counts of assets grouped by type and status
-    asset_counts = (
-        assets.values(
-            'inventoryitem_type__manufacturer__name',
-            'inventoryitem_type__model',
-            'inventoryitem_type',
-            'status',
-        )
-        .annotate(count=Count('pk'))
-        .order_by('inventoryitem_type', 'status')
+    return cached_asset_stats(
+        'type_status',
+        inventoryitem_group,
+        assets,
+        lambda: _asset_counts_type_status(inventoryitem_group, assets),
     )
 
-    def _update_status_meta(entry):
-        """adds color and label keys based on status value"""
-        entry['color'] = AssetStatusChoices.colors.get(entry['status'], 'gray')
-        entry['label'] = dict(AssetStatusChoices).get(entry['status'], entry['status'])
-
-    def _generate_entry(entry_from, status, count=0):
-        t = copy(entry_from)
-        t['status'] = status
-        t['count'] = count
-        _update_status_meta(t)
-        return t
-
-    # for each inventoryitem_type keep track of seen statues and add any that are
-    # missing with count:0
-    zero_counts = []
-    all_statuses = set(AssetStatusChoices.values())
-    last_iid_pk = None
-    seen_statues = set()
-    seen_iit_pks = set()
-    for idx, iit_status_count in enumerate(asset_counts):
-        _update_status_meta(iit_status_count)
-        seen_iit_pks.add(iit_status_count['inventoryitem_type'])
-        if last_iid_pk is None:
-            last_iid_pk = iit_status_count['inventoryitem_type']
-        if last_iid_pk != iit_status_count['inventoryitem_type']:
-            # next iit_pk, add unseen statuses of previous pk
-            for missing_status in all_statuses - seen_statues:
-                zero_counts.append(
-                    _generate_entry(asset_counts[idx - 1], missing_status)
-                )
-            # reset
-            seen_statues = set()
-        last_iid_pk = iit_status_count['inventoryitem_type']
-        seen_statues.add(iit_status_count['status'])
-    # complete missing statues for the last inventoryitem_type in asset_counts
-    if last_iid_pk:
-        for missing_status in all_statuses - seen_statues:
-            zero_counts.append(_generate_entry(iit_status_count, missing_status))
-
-    # now add entries for inventory item types that have no assets at all
-    for iit in (
-        inventoryitem_group.inventoryitem_types.exclude(pk__in=seen_iit_pks)
-        .annotate(
-            inventoryitem_type__manufacturer__name=F('manufacturer__name'),
-            inventoryitem_type__model=F('model'),
-            inventoryitem_type=F('pk'),
-        )
-        .values(
-            'inventoryitem_type__manufacturer__name',
-            'inventoryitem_type__model',
-            'inventoryitem_type',
-        )
+
+def _asset_counts_type_status(inventoryitem_group, assets):
+    groups = inventoryitem_group.get_descendants(include_self=True)
+    counts = defaultdict(dict)
+    for row in (
+        assets.filter(inventoryitem_type__inventoryitem_group__in=groups)
+        .order_by()
+        .values('inventoryitem_type', 'status')
+        .annotate(count=Count('pk'))
     ):
-        for status in all_statuses:
-            zero_counts.append(_generate_entry(iit, status))
-
-    # combine non-zero and zero counts and sort
-    asset_counts = sorted(
-        list(asset_counts) + zero_counts,
-        key=lambda k: (
-            k['inventoryitem_type__manufacturer__name'],
-            k['inventoryitem_type__model'],
-            AssetStatusChoices.values().index(k['status']),
-        ),
+        counts[row['inventoryitem_type']][row['status']] = row['count']
+    inventoryitem_types = (
+        InventoryItemType.objects.filter(inventoryitem_group__in=groups)
+        .order_by('manufacturer__name', 'model')
+        .values('pk', 'inventoryitem_group', 'manufacturer__name', 'model')
     )
-    return asset_counts
+    return [
+        {
+            'inventoryitem_type__manufacturer__name': row['manufacturer__name'],
+            'inventoryitem_type__model': row['model'],
+            'inventoryitem_type': row['pk'],
+            'status_list': [
+                {
+                    'status': status,
+                    'label': label,
+                    'color': AssetStatusChoices.colors.get(status, 'gray'),
+                    'count': counts[row['pk']].get(status, 0),
+                }
+                for status, label in AssetStatusChoices
+            ],
+        }
+        for row in inventoryitem_types
+        if row['inventoryitem_group'] == inventoryitem_group.pk or row['pk'] in counts
+    ]
 
 
 def asset_counts_status(asset_counts):
@@ -111,13 +75,130 @@ def asset_counts_status(asset_counts):
     Aggregates asset counts broken down by inventory item type and status
     (as returned by asset_counts_type_status) to counts on just status valuies.
     """
-    status_counts = {
+    status_counts = _status_counts()
+    for type_counts in asset_counts:
+        for entry in type_counts['status_list']:
+            status_counts[entry['status']]['count'] += entry['count']
+    return status_counts
+
+
+def asset_counts_role_status(asset_role, assets=None):
+    """
+    Return counts of assets by status for an asset role and its descendants.
+    Can optionally accept pre-filtered queryset with assets.
+    Counts for the whole subtree are fetched with one grouped query and rolled
+    up to the role and each of its direct children. Return value is a dict with
+    keys:
+        - count: number of assets in role and its descendants
+        - status_counts: dict of status counts as returned by
+          asset_counts_status
+        - children: list of dicts for each child role with keys id, name, count
+          and status_counts, counting assets in child role and its descendants
+    """
+    if assets is None:
+        assets = Asset.objects.all()
+    roles = list(
+        asset_role.get_descendants(include_self=True).values(
+            'pk', 'name', 'parent', 'lft', 'rght'
+        )
+    )
+    children = [role for role in roles if role['parent'] == asset_role.pk]
+    # map each role in subtree to the child role it belongs to
+    role_child = {
+        role['pk']: child['pk']
+        for child in children
+        for role in roles
+        if child['lft'] <= role['lft'] <= child['rght']
+    }
+    counts = (
+        assets.filter(role__in=[role['pk'] for role in roles])
+        .order_by()
+        .values_list('role', 'status')
+        .annotate(count=Count('pk'))
+    )
+
+    status_counts = _status_counts()
+    child_status_counts = {child['pk']: _status_counts() for child in children}
+    for role_pk, status, count in counts:
+        if status not in status_counts:
+            continue
+        status_counts[status]['count'] += count
+        if role_pk in role_child:
+            child_status_counts[role_child[role_pk]][status]['count'] += count
+
+    return {
+        'count': sum(sc['count'] for sc in status_counts.values()),
+        'status_counts': status_counts,
+        'children': [
+            {
+                'id': child['pk'],
+                'name': child['name'],
+                'count': sum(
+                    sc['count'] for sc in child_status_counts[child['pk']].values()
+                ),
+                'status_counts': child_status_counts[child['pk']],
+            }
+            for child in sorted(children, key=lambda child: child['lft'])
+        ],
+    }
+
+
+# fields assets can be grouped by in asset_counts_grouped()
+ASSET_COUNT_GROUP_FIELDS = (
+    'status',
+    'kind',
+    'role',
+    'installed_site',
+    'installed_location',
+    'storage_location',
+    'tenant',
+    'owning_tenant',
+    'warranty',
+)
+
+
+def asset_counts_grouped(assets, group_by):
+    """
+    Return number of assets for each combination of values of group_by fields,
+    calculated in a single grouped query. group_by is a list of names from
+    ASSET_COUNT_GROUP_FIELDS. FK fields are returned as IDs. `warranty` groups
+    assets by warranty state: expired, expiring (within
+    `asset_warranty_expire_warning_days`), active or unknown.
+    Return value is a list of dicts with group_by keys and count.
+    """
+    group_by = list(dict.fromkeys(group_by))
+    if not group_by:
+        return [{'count': assets.count()}]
+    if 'warranty' in group_by:
+        today = date.today()
+        warning_days = get_plugin_setting('asset_warranty_expire_warning_days')
+        assets = assets.annotate(
+            warranty=Case(
+                When(warranty_end__isnull=True, then=Value('unknown')),
+                When(warranty_end__lt=today, then=Value('expired')),
+                When(
+                    warranty_end__lte=today + timedelta(days=warning_days),
+                    then=Value('expiring'),
+                ),
+                default=Value('active'),
+                output_field=CharField(),
+            )
+        )
+    return list(
+        assets.order_by()
+        .values(*group_by)
+        .annotate(count=Count('pk'))
+        .order_by(*group_by)
+    )
+
+
+def _status_counts():
+    return {
         key: {
             'value': key,
             'label': label,
             'color': AssetStatusChoices.colors[key],
-            'count': sum(e['count'] for e in asset_counts if e['status'] == key),
+            'count': 0,
         }
         for key, label in list(AssetStatusChoices)
     }
-    return status_counts
@@ -0,0 +1,68 @@
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from netbox.api.pagination import OptionalLimitOffsetPagination
+
+__all__ = ('OptionalCursorPagination',)
+
+
+class OptionalCursorPagination(OptionalLimitOffsetPagination):
+    """
+    Limit/offset pagination, with an opt-in keyset pagination mode for paging
+    through large tables.
+
+    Keyset mode is enabled by passing `cursor` query parameter (empty for the
+    first page). Objects are then ordered by ID and each page continues after
+    the last ID of the previous page, so fetching a page doesn't get slower the
+    further you go. The `next` link carries the cursor of the following page.
+    Total count is only calculated if `count=true` is passed as well.
+    """
+
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor = request.query_params.get(self.cursor_query_param)
+        if self.cursor is None:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request) or self.default_limit
+        self.count = None
+        if request.query_params.get(self.count_query_param, '').lower() == 'true':
+            self.count = queryset.count()
+
+        queryset = queryset.order_by('pk')
+        if self.cursor:
+            try:
+                queryset = queryset.filter(pk__gt=int(self.cursor))
+            except ValueError:
+                raise NotFound('Invalid cursor')
+        # fetch one more object to know if there is a next page
+        results = list(queryset[: self.limit + 1])
+        self.next_cursor = None
+        if len(results) > self.limit:
+            results = results[: self.limit]
+            self.next_cursor = results[-1].pk
+        return results
+
+    def get_paginated_response(self, data):
+        if self.cursor is None:
+            return super().get_paginated_response(data)
+        return Response(
+            {
+                'count': self.count,
+                'next': self.get_next_cursor_link(),
+                'previous': None,
+                'results': data,
+            }
+        )
+
+    def get_next_cursor_link(self):
+        if self.next_cursor is None:
+            return None
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.offset_query_param
+        )
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
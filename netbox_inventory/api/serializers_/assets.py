@@ -206,6 +206,9 @@ class AssetSerializer(PrimaryModelSerializer):
         allow_null=True,
         default=None,
     )
+    kind = serializers.CharField(
+        read_only=True,
+    )
 
     def to_internal_value(self, data):
         ret = super().to_internal_value(data)
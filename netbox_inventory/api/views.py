@@ -1,10 +1,22 @@
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import router, transaction
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
 from rest_framework.routers import APIRootView
+from rest_framework.serializers import ListSerializer
 
 from dcim.api.views import DeviceViewSet, InventoryItemViewSet, ModuleViewSet
 from netbox.api.viewsets import NetBoxModelViewSet
 from utilities.query import count_related
 
 from .. import filtersets, models
+from ..analyzers import asset_counts_role_status
+from .export import StreamingExportMixin
+from .pagination import OptionalCursorPagination
 from .serializers import *
 
 __all__ = (
@@ -56,7 +68,7 @@ class InventoryItemTypeViewSet(NetBoxModelViewSet):
     filterset_class = filtersets.InventoryItemTypeFilterSet
 
 
-class AssetViewSet(NetBoxModelViewSet):
+class AssetViewSet(StreamingExportMixin, NetBoxModelViewSet):
     queryset = models.Asset.objects.prefetch_related(
         'device_type',
         'device',
@@ -71,6 +83,68 @@ class AssetViewSet(NetBoxModelViewSet):
     )
     serializer_class = AssetSerializer
     filterset_class = filtersets.AssetFilterSet
+    pagination_class = OptionalCursorPagination
+    export_fields = (
+        'id',
+        'name',
+        'asset_tag',
+        'serial',
+        'status',
+        'kind',
+        'role',
+        'device_type',
+        'module_type',
+        'inventoryitem_type',
+        'rack_type',
+        'device',
+        'module',
+        'inventoryitem',
+        'rack',
+        'tenant',
+        'contact',
+        'owning_tenant',
+        'storage_location',
+        'installed_site',
+        'installed_location',
+        'installed_rack',
+        'installed_device',
+        'delivery',
+        'purchase',
+        'warranty_start',
+        'warranty_end',
+        'description',
+        'comments',
+        'created',
+        'last_updated',
+    )
+    export_related = {
+        'role': 'name',
+        'device_type': 'model',
+        'module_type': 'model',
+        'inventoryitem_type': 'model',
+        'rack_type': 'model',
+        'device': 'name',
+        'module': 'module_bay__name',
+        'inventoryitem': 'name',
+        'rack': 'name',
+        'tenant': 'name',
+        'contact': 'name',
+        'owning_tenant': 'name',
+        'storage_location': 'name',
+        'installed_site': 'name',
+        'installed_location': 'name',
+        'installed_rack': 'name',
+        'installed_device': 'name',
+        'delivery': 'name',
+        'purchase': 'name',
+    }
+    export_related_uncached = (
+        'device',
+        'module',
+        'inventoryitem',
+        'rack',
+        'installed_device',
+    )
 
 
 class DeviceAssetViewSet(DeviceViewSet):
@@ -107,6 +181,27 @@ class AssetRoleViewSet(NetBoxModelViewSet):
     serializer_class = AssetRoleSerializer
     filterset_class = filtersets.AssetRoleFilterSet
 
+    @action(detail=True, methods=['get'], url_path='status-counts')
+    def status_counts(self, request, pk=None):
+        """
+        Return asset counts by status for role and its descendants, along with
+        cumulative counts for each child role.
+        """
+        asset_role = self.get_object()
+        assets = models.Asset.objects.restrict(request.user, 'view')
+        counts = asset_counts_role_status(asset_role, assets)
+        return Response(
+            {
+                'id': asset_role.pk,
+                'count': counts['count'],
+                'status_counts': list(counts['status_counts'].values()),
+                'children': [
+                    {**child, 'status_counts': list(child['status_counts'].values())}
+                    for child in counts['children']
+                ],
+            }
+        )
+
 #
 # Deliveries
 #
@@ -164,6 +259,58 @@ class AuditTrailSourceViewSet(NetBoxModelViewSet):
     serializer_class = AuditTrailSourceSerializer
 
 
-class AuditTrailViewSet(NetBoxModelViewSet):
+class AuditTrailViewSet(StreamingExportMixin, NetBoxModelViewSet):
     queryset = models.AuditTrail.objects.prefetch_related('object')
     serializer_class = AuditTrailSerializer
+    pagination_class = OptionalCursorPagination
+    export_fields = ('id', 'created', 'object_type', 'object_id', 'source')
+    export_related = {
+        'object_type': None,
+        'source': 'name',
+    }
+    # related objects read by str() of audited objects
+    export_object_related = {
+        'dcim.device': ('device_type__manufacturer', 'virtual_chassis'),
+        'dcim.module': ('module_bay', 'module_type'),
+        'netbox_inventory.asset': (
+            'device_type',
+            'module_type',
+            'inventoryitem_type',
+            'rack_type',
+        ),
+    }
+
+    def get_export_columns(self):
+        return [*super().get_export_columns(), 'object']
+
+    def export_chunk(self, chunk):
+        # load audited objects with one query per object type
+        object_ids = defaultdict(set)
+        for row in chunk:
+            object_ids[row['object_type']].add(row['object_id'])
+        objects = {}
+        for object_type_id, ids in object_ids.items():
+            model = ContentType.objects.get_for_id(object_type_id).model_class()
+            if model is None:
+                continue
+            queryset = model.objects.select_related(
+                *self.export_object_related.get(model._meta.label_lower, ())
+            )
+            for pk, obj in queryset.in_bulk(ids).items():
+                objects[object_type_id, pk] = str(obj)
+        for row in chunk:
+            row['object'] = objects.get((row['object_type'], row['object_id']))
+
+    def perform_create(self, serializer):
+        if not isinstance(serializer, ListSerializer):
+            return super().perform_create(serializer)
+
+        # insert a list of audit trails in bulk
+        try:
+            with transaction.atomic(using=router.db_for_write(models.AuditTrail)):
+                serializer.instance = models.AuditTrail.objects.bulk_create_logged(
+                    models.AuditTrail(**attrs) for attrs in serializer.validated_data
+                )
+                self._validate_objects(serializer.instance)
+        except ObjectDoesNotExist:
+            raise PermissionDenied()
@@ -8,3 +8,37 @@ AUDITFLOW_OBJECT_TYPE_CHOICES = Q(
         'rack',
     ),
 )
+
+# Number of rows inserted per query when bulk creating objects
+BULK_CREATE_BATCH_SIZE = 500
+
+# Name of background job that imports assets
+ASSET_IMPORT_JOB_NAME = 'Asset import'
+
+# Directory in default storage where data of asset import jobs is kept while
+# the job runs
+ASSET_IMPORT_STORAGE_PATH = 'netbox_inventory/imports/'
+
+# Maximum number of row errors stored on asset import job
+ASSET_IMPORT_MAX_ERRORS = 1000
+
+# Asset fields (and related object fields) included in asset search document
+ASSET_SEARCH_DOCUMENT_FIELDS = (
+    'id',
+    'serial',
+    'name',
+    'description',
+    'asset_tag',
+    'device_type__model',
+    'module_type__model',
+    'inventoryitem_type__model',
+    'rack_type__model',
+    'device__name',
+    'inventoryitem__name',
+    'rack__name',
+    'delivery__name',
+    'purchase__name',
+    'purchase__supplier__name',
+    'tenant__name',
+    'owning_tenant__name',
+)
@@ -30,7 +30,11 @@ from utilities.filtersets import register_filterset
 
 from .choices import AssetStatusChoices, HardwareKindChoices, PurchaseStatusChoices
 from .models import *
-from .utils import get_asset_custom_fields_search_filters, query_located
+from .utils import (
+    get_asset_custom_fields_search_filters,
+    get_plugin_setting,
+    query_located,
+)
 
 __all__ = (
     'AssetFilterSet',
@@ -465,6 +469,10 @@ class AssetFilterSet(PrimaryModelFilterSet):
         )
 
     def search(self, queryset, name, value):
+        if get_plugin_setting('asset_search_document'):
+            # trigram indexed, maintained from the same fields as below
+            return queryset.filter(search_document__contains=value.strip().lower())
+
         query = (
             Q(id__contains=value)
             | Q(serial__icontains=value)
@@ -491,16 +499,9 @@ class AssetFilterSet(PrimaryModelFilterSet):
         return queryset.filter(query)
 
     def filter_kind(self, queryset, name, value):
-        query = None
-        for kind in HardwareKindChoices.values():
-            if kind in value:
-                q = Q(**{f'{kind}_type__isnull': False})
-                if query:
-                    query = query | q
-                else:
-                    query = q
-        if query:
-            return queryset.filter(query)
+        kinds = [kind for kind in HardwareKindChoices.values() if kind in value]
+        if kinds:
+            return queryset.filter(kind__in=kinds)
         else:
             return queryset
 
@@ -543,7 +544,7 @@ class AssetFilterSet(PrimaryModelFilterSet):
         return query_located(queryset, 'site__slug', value, assets_shown='installed')
 
     def filter_installed_device(self, queryset, name, value):
-        return query_located(queryset, name, value, assets_shown='installed')
+        return queryset.filter(**{f'installed_device__{name}__in': value})
 
     def filter_located(self, queryset, name, value):
         return query_located(queryset, name, value)
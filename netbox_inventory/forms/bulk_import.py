@@ -1,9 +1,14 @@
+import uuid
+
 from django import forms
 from django.core.exceptions import ObjectDoesNotExist
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
 
-from core.models import ObjectType
+from core.choices import JobStatusChoices
+from core.models import Job, ObjectType
 from dcim.models import DeviceType, Location, Manufacturer, ModuleType, RackType, Site
 from netbox.forms import NetBoxModelImportForm, PrimaryModelImportForm
 from tenancy.models import Contact, Tenant
@@ -14,12 +19,23 @@ from utilities.forms.fields import (
 )
 
 from ..choices import AssetStatusChoices, HardwareKindChoices, PurchaseStatusChoices
-from ..constants import AUDITFLOW_OBJECT_TYPE_CHOICES
+from ..constants import (
+    ASSET_IMPORT_JOB_NAME,
+    ASSET_IMPORT_STORAGE_PATH,
+    AUDITFLOW_OBJECT_TYPE_CHOICES,
+)
 from ..models import *
-from ..utils import get_plugin_setting
+from ..utils import (
+    cached_get,
+    cached_get_or_create,
+    file_sha256,
+    get_plugin_setting,
+    import_cached,
+)
 
 __all__ = (
     'AssetImportForm',
+    'AssetImportJobForm',
     'AssetRoleImportForm',
     'AuditFlowImportForm',
     'AuditFlowPageImportForm',
@@ -33,6 +49,20 @@ __all__ = (
 )
 
 
+class CachedCSVModelChoiceField(CSVModelChoiceField):
+    """
+    CSVModelChoiceField that resolves values through the import lookup cache.
+    Only use with querysets that don't vary between rows.
+    """
+
+    def to_python(self, value):
+        resolve = super().to_python
+        return import_cached(
+            ('field', self.queryset.model, self.to_field_name, value),
+            lambda: resolve(value),
+        )
+
+
 #
 # Assets
 #
@@ -86,7 +116,7 @@ class AssetImportForm(PrimaryModelImportForm):
         required=True,
         help_text='What kind of hardware is this.',
     )
-    manufacturer = CSVModelChoiceField(
+    manufacturer = CachedCSVModelChoiceField(
         queryset=Manufacturer.objects.all(),
         to_field_name='name',
         required=True,
@@ -112,13 +142,13 @@ class AssetImportForm(PrimaryModelImportForm):
         choices=AssetStatusChoices,
         help_text='Asset lifecycle status.',
     )
-    role = CSVModelChoiceField(
+    role = CachedCSVModelChoiceField(
         queryset=AssetRole.objects.all(),
         to_field_name='name',
         required=False,
         help_text='Role assigned to this asset. It must exist before import.',
     )
-    storage_site = CSVModelChoiceField(
+    storage_site = CachedCSVModelChoiceField(
         queryset=Site.objects.all(),
         to_field_name='name',
         help_text='Site that contains storage_location asset will be stored in.',
@@ -130,7 +160,7 @@ class AssetImportForm(PrimaryModelImportForm):
         help_text='Location where is this asset stored when not in use. It must exist before import.',
         required=False,
     )
-    owning_tenant = CSVModelChoiceField(
+    owning_tenant = CachedCSVModelChoiceField(
         queryset=Tenant.objects.all(),
         to_field_name='name',
         help_text='Tenant that owns this asset. It must exist before import.',
@@ -144,7 +174,7 @@ class AssetImportForm(PrimaryModelImportForm):
         help_text='Date when this delivery was made.',
         required=False,
     )
-    receiving_contact = CSVModelChoiceField(
+    receiving_contact = CachedCSVModelChoiceField(
         queryset=Contact.objects.all(),
         to_field_name='name',
         help_text='Contact that accepted this delivery. It must exist before import.',
@@ -161,19 +191,19 @@ class AssetImportForm(PrimaryModelImportForm):
     purchase_status = CSVChoiceField(
         choices=PurchaseStatusChoices, help_text='Status of purchase', required=False
     )
-    supplier = CSVModelChoiceField(
+    supplier = CachedCSVModelChoiceField(
         queryset=Supplier.objects.all(),
         to_field_name='name',
         help_text='Legal entity this purchase was made from. Required if a new purchase is given.',
         required=False,
     )
-    tenant = CSVModelChoiceField(
+    tenant = CachedCSVModelChoiceField(
         queryset=Tenant.objects.all(),
         to_field_name='name',
         help_text='Tenant using this asset. See "Import settings" for more info.',
         required=False,
     )
-    contact = CSVModelChoiceField(
+    contact = CachedCSVModelChoiceField(
         queryset=Contact.objects.all(),
         to_field_name='name',
         help_text='Contact using this asset. It must exist before import.',
@@ -230,8 +260,8 @@ class AssetImportForm(PrimaryModelImportForm):
         elif hardware_kind == 'rack':
             hardware_class = RackType
         try:
-            hardware_type = hardware_class.objects.get(
-                manufacturer=manufacturer, model=model
+            hardware_type = cached_get(
+                hardware_class, manufacturer=manufacturer, model=model
             )
         except ObjectDoesNotExist:
             raise forms.ValidationError(
@@ -246,7 +276,7 @@ class AssetImportForm(PrimaryModelImportForm):
         if not purchase_name:
             return None
         try:
-            purchase = Purchase.objects.get(supplier=supplier, name=purchase_name)
+            purchase = cached_get(Purchase, supplier=supplier, name=purchase_name)
         except ObjectDoesNotExist:
             raise forms.ValidationError(
                 f'Unable to find purchase {supplier} {purchase_name}'
@@ -259,7 +289,7 @@ class AssetImportForm(PrimaryModelImportForm):
         if not delivery_name:
             return None
         try:
-            delivery = Delivery.objects.get(purchase=purchase, name=delivery_name)
+            delivery = cached_get(Delivery, purchase=purchase, name=delivery_name)
         except ObjectDoesNotExist:
             raise forms.ValidationError(
                 f'Unable to find delivery {purchase} {delivery_name}'
@@ -318,7 +348,8 @@ class AssetImportForm(PrimaryModelImportForm):
                 and self.data.get('purchase')
                 and self.data.get('supplier')
             ):
-                purchase, _ = Purchase.objects.get_or_create(
+                purchase, _ = cached_get_or_create(
+                    Purchase,
                     name=self.data.get('purchase'),
                     supplier=self._get_or_create_related('supplier'),
                     defaults={
@@ -327,7 +358,8 @@ class AssetImportForm(PrimaryModelImportForm):
                     },
                 )
                 if self.data.get('delivery'):
-                    Delivery.objects.get_or_create(
+                    cached_get_or_create(
+                        Delivery,
                         name=self.data.get('delivery'),
                         purchase=purchase,
                         defaults={
@@ -341,7 +373,8 @@ class AssetImportForm(PrimaryModelImportForm):
                 get_plugin_setting('asset_import_create_device_type')
                 and self.data.get('hardware_kind') == 'device'
             ):
-                DeviceType.objects.get_or_create(
+                cached_get_or_create(
+                    DeviceType,
                     model__iexact=self.data.get('model_name'),
                     manufacturer=self._get_or_create_related('manufacturer'),
                     defaults={
@@ -356,7 +389,8 @@ class AssetImportForm(PrimaryModelImportForm):
                 get_plugin_setting('asset_import_create_module_type')
                 and self.data.get('hardware_kind') == 'module'
             ):
-                ModuleType.objects.get_or_create(
+                cached_get_or_create(
+                    ModuleType,
                     model__iexact=self.data.get('model_name'),
                     manufacturer=self._get_or_create_related('manufacturer'),
                     defaults={
@@ -370,7 +404,8 @@ class AssetImportForm(PrimaryModelImportForm):
                 get_plugin_setting('asset_import_create_inventoryitem_type')
                 and self.data.get('hardware_kind') == 'inventoryitem'
             ):
-                InventoryItemType.objects.get_or_create(
+                cached_get_or_create(
+                    InventoryItemType,
                     model__iexact=self.data.get('model_name'),
                     manufacturer=self._get_or_create_related('manufacturer'),
                     defaults={
@@ -385,7 +420,8 @@ class AssetImportForm(PrimaryModelImportForm):
                 get_plugin_setting('asset_import_create_rack_type')
                 and self.data.get('hardware_kind') == 'rack'
             ):
-                RackType.objects.get_or_create(
+                cached_get_or_create(
+                    RackType,
                     model__iexact=self.data.get('model_name'),
                     manufacturer=self._get_or_create_related('manufacturer'),
                     defaults={
@@ -427,7 +463,8 @@ class AssetImportForm(PrimaryModelImportForm):
         }
         # whatever field was in import data is used as is
         instance_defaults.update({to_field_name: self.data.get(field_name)})
-        instance, _ = klass.objects.get_or_create(
+        instance, _ = cached_get_or_create(
+            klass,
             # filter on field specified in column header
             **{to_field_name + '__iexact': self.data.get(field_name)},
             defaults=instance_defaults,
@@ -448,6 +485,72 @@ class AssetImportForm(PrimaryModelImportForm):
             self.add_error(field_name, e)
             raise
 
+
+class AssetImportJobForm(forms.Form):
+    """Form for importing assets in a background job"""
+
+    data = forms.CharField(
+        required=False,
+        widget=forms.Textarea(attrs={'class': 'font-monospace'}),
+        help_text='Enter CSV or JSON data, same as for regular import.',
+    )
+    upload_file = forms.FileField(
+        label='Data file',
+        required=False,
+    )
+    format = forms.ChoiceField(
+        choices=(('csv', 'CSV'), ('json', 'JSON')),
+        initial='csv',
+    )
+    chunk_size = forms.IntegerField(
+        min_value=1,
+        required=False,
+        help_text='Number of rows committed at a time. Defaults to asset_import_chunk_size setting.',
+    )
+    resume_job = forms.ModelChoiceField(
+        queryset=Job.objects.filter(
+            name=ASSET_IMPORT_JOB_NAME,
+            status__in=(
+                JobStatusChoices.STATUS_ERRORED,
+                JobStatusChoices.STATUS_FAILED,
+            ),
+        ),
+        required=False,
+        help_text='Skip rows already committed by this earlier, failed import of the same data.',
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        data = cleaned_data.get('data')
+        upload_file = cleaned_data.get('upload_file')
+        if data and upload_file:
+            raise forms.ValidationError('Provide either data or a data file, not both.')
+        if upload_file:
+            cleaned_data['data_file'] = upload_file
+        elif data:
+            cleaned_data['data_file'] = ContentFile(data.encode('utf-8'))
+        else:
+            raise forms.ValidationError('Provide data or a data file to import.')
+
+        resume_job = cleaned_data.get('resume_job')
+        if resume_job:
+            sha256 = file_sha256(cleaned_data['data_file'])
+            if (resume_job.data or {}).get('sha256') != sha256:
+                raise forms.ValidationError(
+                    {'resume_job': 'Data is not the same as imported by this job.'}
+                )
+        return cleaned_data
+
+    def save_data_file(self):
+        """
+        Save data to default storage, so it isn't passed to the job itself.
+        Returns name of the saved file.
+        """
+        extension = self.cleaned_data['format']
+        name = f'{ASSET_IMPORT_STORAGE_PATH}{uuid.uuid4().hex}.{extension}'
+        return default_storage.save(name, self.cleaned_data['data_file'])
+
+
 class AssetRoleImportForm(PrimaryModelImportForm):
     parent = CSVModelChoiceField(
         queryset=AssetRole.objects.all(),
@@ -0,0 +1,35 @@
+from graphql import GraphQLError
+from strawberry.extensions import FieldExtension
+from strawberry.types.nodes import SelectedField
+
+from netbox_inventory.utils import get_plugin_setting
+
+__all__ = ('MaxDepthExtension',)
+
+
+def selection_depth(selections):
+    """
+    Return depth of nested field selections. Fragments don't add depth.
+    """
+    depth = 0
+    for selection in selections:
+        child_depth = selection_depth(selection.selections)
+        if isinstance(selection, SelectedField) and selection.selections:
+            child_depth += 1
+        depth = max(depth, child_depth)
+    return depth
+
+
+class MaxDepthExtension(FieldExtension):
+    """
+    Reject queries of a field that select related objects deeper than
+    `graphql_max_depth` setting.
+    """
+
+    def resolve(self, next_, source, info, **kwargs):
+        max_depth = get_plugin_setting('graphql_max_depth')
+        if max_depth and selection_depth(info.selected_fields) > max_depth:
+            raise GraphQLError(
+                f'Query of {info.field_name} exceeds maximum depth of {max_depth}'
+            )
+        return next_(source, info, **kwargs)
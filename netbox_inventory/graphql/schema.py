@@ -1,7 +1,13 @@
 import strawberry
 import strawberry_django
+from strawberry.types import Info
+from strawberry_django.filters import apply as apply_filters
 
+from .extensions import MaxDepthExtension
+from .filters import AssetFilter
 from .types import (
+    AssetCountGroupBy,
+    AssetCountType,
     AssetRoleType,
     AssetType,
     DeliveryType,
@@ -10,73 +16,102 @@ from .types import (
     PurchaseType,
     SupplierType,
 )
-from netbox_inventory.models import (
-    Asset,
-    AssetRole,
-    Delivery,
-    InventoryItemGroup,
-    InventoryItemType,
-    Purchase,
-    Supplier,
-)
+from netbox_inventory.analyzers import asset_counts_grouped
+from netbox_inventory.models import Asset
+
+# asset_counts() fields that are not FKs
+PLAIN_COUNT_FIELDS = ('count', 'status', 'kind', 'warranty')
 
 
 @strawberry.type
 class AssetQuery:
+    asset: AssetType = strawberry_django.field(
+        extensions=[MaxDepthExtension()],
+    )
+    asset_list: list[AssetType] = strawberry_django.field(
+        extensions=[MaxDepthExtension()],
+    )
+
     @strawberry.field
-    def asset(self, id: int) -> AssetType:
-        return Asset.objects.get(pk=id)
+    def asset_counts(
+        self,
+        info: Info,
+        group_by: list[AssetCountGroupBy],
+        filters: AssetFilter | None = strawberry.UNSET,
+    ) -> list[AssetCountType]:
+        """
+        Count assets grouped by given fields, calculated in the database.
+        """
+        assets = Asset.objects.restrict(info.context.request.user, 'view')
+        if filters:
+            assets = apply_filters(filters, assets, info)
+        counts = asset_counts_grouped(assets, [field.value for field in group_by])
+        return [
+            AssetCountType(
+                **{
+                    field if field in PLAIN_COUNT_FIELDS else f'{field}_id': value
+                    for field, value in row.items()
+                }
+            )
+            for row in counts
+        ]
 
-    asset_list: list[AssetType] = strawberry_django.field()
 
 @strawberry.type
 class AssetRoleQuery:
-    @strawberry.field
-    def asset_role(self, id: int) -> AssetRoleType:
-        return AssetRole.objects.get(pk=id)
+    asset_role: AssetRoleType = strawberry_django.field(
+        extensions=[MaxDepthExtension()],
+    )
+    asset_role_list: list[AssetRoleType] = strawberry_django.field(
+        extensions=[MaxDepthExtension()],
+    )
 
-    asset_role_list: list[AssetRoleType] = strawberry_django.field()
 
 @strawberry.type
 class SupplierQuery:
-    @strawberry.field
-    def supplier(self, id: int) -> SupplierType:
-        return Supplier.objects.get(pk=id)
-
-    supplier_list: list[SupplierType] = strawberry_django.field()
+    supplier: SupplierType = strawberry_django.field(
+        extensions=[MaxDepthExtension()],
+    )
+    supplier_list: list[SupplierType] = strawberry_django.field(
+        extensions=[MaxDepthExtension()],
+    )
 
 
 @strawberry.type
 class PurchaseQuery:
-    @strawberry.field
-    def purchase(self, id: int) -> PurchaseType:
-        return Purchase.objects.get(pk=id)
-
-    purchase_list: list[PurchaseType] = strawberry_django.field()
+    purchase: PurchaseType = strawberry_django.field(
+        extensions=[MaxDepthExtension()],
+    )
+    purchase_list: list[PurchaseType] = strawberry_django.field(
+        extensions=[MaxDepthExtension()],
+    )
 
 
 @strawberry.type
 class DeliveryQuery:
-    @strawberry.field
-    def delivery(self, id: int) -> DeliveryType:
-        return Delivery.objects.get(pk=id)
-
-    delivery_list: list[DeliveryType] = strawberry_django.field()
+    delivery: DeliveryType = strawberry_django.field(
+        extensions=[MaxDepthExtension()],
+    )
+    delivery_list: list[DeliveryType] = strawberry_django.field(
+        extensions=[MaxDepthExtension()],
+    )
 
 
 @strawberry.type
 class InventoryItemTypeQuery:
-    @strawberry.field
-    def inventory_item_type(self, id: int) -> InventoryItemTypeType:
-        return InventoryItemType.objects.get(pk=id)
-
-    inventory_item_type_list: list[InventoryItemTypeType] = strawberry_django.field()
+    inventory_item_type: InventoryItemTypeType = strawberry_django.field(
+        extensions=[MaxDepthExtension()],
+    )
+    inventory_item_type_list: list[InventoryItemTypeType] = strawberry_django.field(
+        extensions=[MaxDepthExtension()],
+    )
 
 
 @strawberry.type
 class InventoryItemGroupQuery:
-    @strawberry.field
-    def inventory_item_group(self, id: int) -> InventoryItemGroupType:
-        return InventoryItemGroup.objects.get(pk=id)
-
-    inventory_item_group_list: list[InventoryItemGroupType] = strawberry_django.field()
+    inventory_item_group: InventoryItemGroupType = strawberry_django.field(
+        extensions=[MaxDepthExtension()],
+    )
+    inventory_item_group_list: list[InventoryItemGroupType] = strawberry_django.field(
+        extensions=[MaxDepthExtension()],
+    )
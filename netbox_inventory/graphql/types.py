@@ -1,3 +1,4 @@
+from enum import Enum
 from typing import Annotated
 
 import strawberry
@@ -12,6 +13,7 @@ from dcim.graphql.types import (
     ModuleTypeType,
     RackType,
     RackTypeType,
+    SiteType,
 )
 from extras.graphql.mixins import ContactsMixin, ImageAttachmentsMixin
 from netbox.graphql.types import NetBoxObjectType, OrganizationalObjectType
@@ -37,7 +39,9 @@ from netbox_inventory.models import (
 )
 
 
-@strawberry_django.type(Asset, fields='__all__', filters=AssetFilter)
+@strawberry_django.type(
+    Asset, exclude=('search_document',), filters=AssetFilter
+)
 class AssetType(ImageAttachmentsMixin, NetBoxObjectType):
     device_type: (
         Annotated['DeviceTypeType', strawberry.lazy('dcim.graphql.types')] | None
@@ -63,6 +67,18 @@ class AssetType(ImageAttachmentsMixin, NetBoxObjectType):
     storage_location: (
         Annotated['LocationType', strawberry.lazy('dcim.graphql.types')] | None
     )
+    installed_site: (
+        Annotated['SiteType', strawberry.lazy('dcim.graphql.types')] | None
+    )
+    installed_location: (
+        Annotated['LocationType', strawberry.lazy('dcim.graphql.types')] | None
+    )
+    installed_rack: (
+        Annotated['RackType', strawberry.lazy('dcim.graphql.types')] | None
+    )
+    installed_device: (
+        Annotated['DeviceType', strawberry.lazy('dcim.graphql.types')] | None
+    )
     owner: Annotated['TenantType', strawberry.lazy('tenancy.graphql.types')] | None
     delivery: (
         Annotated['DeliveryType', strawberry.lazy('netbox_inventory.graphql.types')]
@@ -155,3 +171,35 @@ class InventoryItemGroupType(OrganizationalObjectType):
             'InventoryItemGroupType', strawberry.lazy('netbox_inventory.graphql.types')
         ]
     ]
+
+
+@strawberry.enum
+class AssetCountGroupBy(Enum):
+    status = 'status'
+    kind = 'kind'
+    role = 'role'
+    installed_site = 'installed_site'
+    installed_location = 'installed_location'
+    storage_location = 'storage_location'
+    tenant = 'tenant'
+    owning_tenant = 'owning_tenant'
+    warranty = 'warranty'
+
+
+@strawberry.type
+class AssetCountType:
+    """
+    Number of assets with a combination of grouped values. Only fields assets
+    were grouped by are set.
+    """
+
+    count: int
+    status: str | None = None
+    kind: str | None = None
+    role_id: int | None = None
+    installed_site_id: int | None = None
+    installed_location_id: int | None = None
+    storage_location_id: int | None = None
+    tenant_id: int | None = None
+    owning_tenant_id: int | None = None
+    warranty: str | None = None
@@ -0,0 +1,154 @@
+import hashlib
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db import models
+from django.db.models.fields.json import KeyTextTransform, KeyTransform
+from django.db.models.functions import Upper
+
+from .utils import get_plugin_setting
+
+__all__ = (
+    'CUSTOM_FIELD_INDEX_PREFIX',
+    'add_custom_field_indexes',
+    'custom_field_index',
+    'get_custom_field_indexes',
+    'get_existing_custom_field_indexes',
+    'remove_custom_field_indexes',
+    'sync_custom_field_indexes',
+)
+
+# all indexes managed here have names starting with this prefix
+CUSTOM_FIELD_INDEX_PREFIX = 'inventory_cf_'
+
+# case insensitive substring lookups, served by trigram index on upper(value)
+UPPER_TRIGRAM_LOOKUPS = ('icontains', 'iendswith')
+# case sensitive substring lookups, served by trigram index on value
+TRIGRAM_LOOKUPS = ('endswith',)
+# case insensitive equality and prefix lookups, served by btree on upper(value)
+UPPER_PATTERN_LOOKUPS = ('iexact', 'istartswith')
+# case sensitive prefix lookups, served by btree on value
+PATTERN_LOOKUPS = ('startswith',)
+# lookups comparing JSON values, served by btree on JSON value
+JSON_LOOKUPS = ('exact', 'in', 'gt', 'gte', 'lt', 'lte')
+
+
+def custom_field_index(field_name, lookup):
+    """
+    Return an index on Asset.custom_field_data that can serve
+    `custom_field_data__<field_name>__<lookup>` filter, or None if there is
+    no suitable index for that lookup.
+
+    Lookups that would be served by the same index return indexes with the same
+    name.
+    """
+    if lookup in UPPER_TRIGRAM_LOOKUPS:
+        kind = 'upper_trgm'
+        expression = OpClass(
+            Upper(KeyTextTransform(field_name, 'custom_field_data')),
+            name='gin_trgm_ops',
+        )
+    elif lookup in TRIGRAM_LOOKUPS:
+        kind = 'trgm'
+        expression = OpClass(
+            KeyTextTransform(field_name, 'custom_field_data'),
+            name='gin_trgm_ops',
+        )
+    elif lookup in UPPER_PATTERN_LOOKUPS:
+        kind = 'upper_pattern'
+        expression = OpClass(
+            Upper(KeyTextTransform(field_name, 'custom_field_data')),
+            name='text_pattern_ops',
+        )
+    elif lookup in PATTERN_LOOKUPS:
+        kind = 'pattern'
+        expression = OpClass(
+            KeyTextTransform(field_name, 'custom_field_data'),
+            name='text_pattern_ops',
+        )
+    elif lookup in JSON_LOOKUPS:
+        kind = 'json'
+        expression = KeyTransform(field_name, 'custom_field_data')
+    else:
+        return None
+
+    digest = hashlib.sha256(f'{field_name}:{kind}'.encode()).hexdigest()[:12]
+    name = f'{CUSTOM_FIELD_INDEX_PREFIX}{digest}'
+    if kind.endswith('trgm'):
+        return GinIndex(expression, name=name)
+    return models.Index(expression, name=name)
+
+
+def get_custom_field_indexes():
+    """
+    Return indexes needed for `asset_custom_fields_search_filters` setting.
+
+    Returns a tuple (indexes, unsupported), where indexes is a dict of index name
+    to (index, filters) with filters that index serves, and unsupported is a list
+    of filters that can't be served by any index.
+    """
+    indexes = {}
+    unsupported = []
+    custom_fields_filters = get_plugin_setting('asset_custom_fields_search_filters')
+    for field_name, lookups in custom_fields_filters.items():
+        for lookup in lookups:
+            filter = f'custom_field_data__{field_name}__{lookup}'
+            index = custom_field_index(field_name, lookup)
+            if index is None:
+                unsupported.append(filter)
+                continue
+            indexes.setdefault(index.name, (index, []))[1].append(filter)
+    return indexes, unsupported
+
+
+def get_existing_custom_field_indexes(model, connection):
+    """
+    Return names of custom field indexes that exist on model's table.
+    """
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(
+            cursor, model._meta.db_table
+        )
+    return {
+        name
+        for name, constraint in constraints.items()
+        if constraint['index'] and name.startswith(CUSTOM_FIELD_INDEX_PREFIX)
+    }
+
+
+def sync_custom_field_indexes(model, schema_editor, concurrently=False, drop=False):
+    """
+    Create missing indexes for `asset_custom_fields_search_filters` setting and
+    drop indexes for filters that are no longer configured. If drop is True, all
+    custom field indexes are dropped instead.
+
+    Returns a tuple of (created, dropped) index names.
+    """
+    indexes = {} if drop else get_custom_field_indexes()[0]
+    existing = get_existing_custom_field_indexes(model, schema_editor.connection)
+    dropped = sorted(existing - set(indexes))
+    created = sorted(set(indexes) - existing)
+    kwargs = {'concurrently': True} if concurrently else {}
+    for name in dropped:
+        # only the name is needed to drop an index
+        index = models.Index(fields=('custom_field_data',), name=name)
+        schema_editor.remove_index(model, index, **kwargs)
+    for name in created:
+        schema_editor.add_index(model, indexes[name][0], **kwargs)
+    return created, dropped
+
+
+def add_custom_field_indexes(apps, schema_editor):
+    """
+    Sync custom field indexes with settings. Can be used in a RunPython operation
+    of a NetBox installation's local migration.
+    """
+    Asset = apps.get_model('netbox_inventory', 'Asset')
+    sync_custom_field_indexes(Asset, schema_editor)
+
+
+def remove_custom_field_indexes(apps, schema_editor):
+    """
+    Drop all custom field indexes, reverse of add_custom_field_indexes().
+    """
+    Asset = apps.get_model('netbox_inventory', 'Asset')
+    sync_custom_field_indexes(Asset, schema_editor, drop=True)
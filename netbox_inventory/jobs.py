@@ -0,0 +1,192 @@
+import csv
+import io
+import json
+from contextlib import ExitStack
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+
+from core.models import Job
+from netbox.context import events_queue
+from netbox.jobs import JobRunner
+from netbox.registry import registry
+from utilities.exceptions import AbortRequest, PermissionsViolation
+
+from .constants import ASSET_IMPORT_JOB_NAME, ASSET_IMPORT_MAX_ERRORS
+from .forms import AssetImportForm
+from .models import Asset
+from .utils import file_sha256, get_plugin_setting, import_lookup_cache
+
+__all__ = ('AssetImportJob',)
+
+
+class AssetImportJob(JobRunner):
+    """
+    Import assets from CSV or JSON data in a background job.
+
+    Each row is validated with AssetImportForm, same as interactive import. Rows
+    are committed in chunks of `chunk_size`; a row that fails is rolled back on
+    its own and reported in job data, while the rest of the chunk is committed.
+    Data is read from `data_file` in default storage, which is deleted when the
+    job ends. Progress is stored in job data after every chunk, so an interrupted
+    import of the same data (checked by its sha256) can be resumed from the last
+    committed chunk by passing `resume_job_id`.
+    """
+
+    class Meta:
+        name = ASSET_IMPORT_JOB_NAME
+
+    def run(
+        self,
+        data_file,
+        format='csv',
+        chunk_size=None,
+        resume_job_id=None,
+        request=None,
+        *args,
+        **kwargs,
+    ):
+        try:
+            self._run(data_file, format, chunk_size, resume_job_id, request)
+        finally:
+            default_storage.delete(data_file)
+
+    def _run(self, data_file, format, chunk_size, resume_job_id, request):
+        chunk_size = chunk_size or get_plugin_setting('asset_import_chunk_size')
+        with default_storage.open(data_file, 'rb') as file:
+            sha256 = file_sha256(file)
+        resume_from = 0
+        if resume_job_id:
+            previous_job = Job.objects.get(pk=resume_job_id)
+            if (previous_job.data or {}).get('sha256') != sha256:
+                raise ValueError(
+                    f'Data is not the same as imported by job {resume_job_id}'
+                )
+            resume_from = previous_job.data.get('committed_rows', 0)
+
+        self.user = request.user if request else self.job.user
+        self.job.data = {
+            'sha256': sha256,
+            'resumed_from': resume_from,
+            'committed_rows': resume_from,
+            'created': 0,
+            'updated': 0,
+            'error_count': 0,
+            'errors': [],
+        }
+        self.job.save(update_fields=['data'])
+
+        with default_storage.open(data_file, 'rb') as file:
+            text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+            records = islice(self._iter_records(text, format), resume_from, None)
+            self._import_records(records, chunk_size, resume_from, request)
+
+    def _import_records(self, records, chunk_size, row_number, request):
+        with import_lookup_cache() as cache:
+            while chunk := list(islice(records, chunk_size)):
+                with ExitStack() as stack:
+                    # changelog, event rules etc.
+                    for request_processor in registry['request_processors']:
+                        stack.enter_context(request_processor(request))
+                    stack.enter_context(transaction.atomic())
+                    for record in chunk:
+                        row_number += 1
+                        self._import_row(row_number, record, cache)
+                self.job.data['committed_rows'] = row_number
+                self.job.save(update_fields=['data'])
+
+    @staticmethod
+    def _iter_records(file, format):
+        """
+        Yield (record, headers) for each row in file. CSV is read row by row,
+        JSON has to be parsed as a whole.
+        """
+        if format == 'json':
+            records = json.load(file)
+            if isinstance(records, dict):
+                records = [records]
+            for record in records:
+                yield record, None
+            return
+
+        reader = csv.reader(file)
+        # column headers may specify to_field for related objects (e.g. "tenant.slug")
+        headers = {}
+        for header in next(reader, []):
+            field, _, to_field = header.strip().partition('.')
+            headers[field] = to_field or None
+        for row in reader:
+            if not any(col.strip() for col in row):
+                # skip blank lines
+                continue
+            if len(row) != len(headers):
+                yield (
+                    ValueError(
+                        f'Row has {len(row)} columns, but {len(headers)} headers are defined'
+                    ),
+                    headers,
+                )
+                continue
+            yield dict(zip(headers, (col.strip() for col in row))), headers
+
+    def _import_row(self, row_number, row, cache):
+        # events queued by a failed row must not be sent when the chunk commits
+        events = dict(events_queue.get() or {})
+        try:
+            with transaction.atomic():
+                instance = self._save_row(*row)
+        except PermissionsViolation:
+            self._rollback_row(cache, events)
+            self._add_error(row_number, {'__all__': ['Permission denied']})
+        except ValidationError as e:
+            self._rollback_row(cache, events)
+            if hasattr(e, 'error_dict'):
+                self._add_error(row_number, e.message_dict)
+            else:
+                self._add_error(row_number, {'__all__': e.messages})
+        except (
+            AbortRequest,
+            IntegrityError,
+            ValueError,
+            Asset.DoesNotExist,
+        ) as e:
+            self._rollback_row(cache, events)
+            self._add_error(row_number, {'__all__': [str(e)]})
+        else:
+            self.job.data['updated' if instance else 'created'] += 1
+
+    def _save_row(self, record, headers):
+        """
+        Validate and save a single record. Returns existing asset that was
+        updated, or None if a new one was created.
+        """
+        if isinstance(record, Exception):
+            raise record
+        instance = None
+        if record.get('id'):
+            instance = Asset.objects.restrict(self.user, 'change').get(pk=record['id'])
+            instance.snapshot()
+        form = AssetImportForm(data=record, instance=instance, headers=headers)
+        if not form.is_valid():
+            raise ValidationError(form.errors)
+        obj = form.save()
+        action = 'change' if instance else 'add'
+        if not Asset.objects.restrict(self.user, action).filter(pk=obj.pk).exists():
+            raise PermissionsViolation()
+        return instance
+
+    @staticmethod
+    def _rollback_row(cache, events):
+        """
+        Forget state of a row whose savepoint was rolled back: related objects
+        cached for it and events it queued.
+        """
+        cache.clear()
+        events_queue.set(events)
+
+    def _add_error(self, row_number, errors):
+        self.job.data['error_count'] += 1
+        if len(self.job.data['errors']) < ASSET_IMPORT_MAX_ERRORS:
+            self.job.data['errors'].append({'row': row_number, 'errors': errors})
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from netbox_inventory.indexes import (
+    get_custom_field_indexes,
+    get_existing_custom_field_indexes,
+    sync_custom_field_indexes,
+)
+from netbox_inventory.models import Asset
+
+
+class Command(BaseCommand):
+    help = (
+        'Create and drop indexes on asset custom field data to match '
+        'asset_custom_fields_search_filters setting'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report index status of configured filters, make no changes',
+        )
+        parser.add_argument(
+            '--drop',
+            action='store_true',
+            help='Drop all custom field indexes',
+        )
+
+    def handle(self, *args, **options):
+        if not options['check']:
+            # build indexes without locking asset table for writes
+            with connection.schema_editor(atomic=False) as schema_editor:
+                created, dropped = sync_custom_field_indexes(
+                    Asset, schema_editor, concurrently=True, drop=options['drop']
+                )
+            for name in dropped:
+                self.stdout.write(f'Dropped index {name}')
+            for name in created:
+                self.stdout.write(f'Created index {name}')
+
+        indexes, unsupported = get_custom_field_indexes()
+        existing = get_existing_custom_field_indexes(Asset, connection)
+        for name, (_, filters) in indexes.items():
+            for filter in filters:
+                if name in existing:
+                    self.stdout.write(f'{filter}: index {name}')
+                else:
+                    self.stdout.write(
+                        self.style.WARNING(f'{filter}: index {name} does not exist')
+                    )
+        for filter in unsupported:
+            self.stdout.write(
+                self.style.WARNING(f'{filter}: lookup type can not use an index')
+            )
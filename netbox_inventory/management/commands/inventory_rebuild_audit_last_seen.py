@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from netbox_inventory.models import AuditLastSeen, AuditTrail
+
+
+class Command(BaseCommand):
+    help = 'Rebuild last seen audit trail of all audited objects from audit trails'
+
+    def handle(self, *args, **options):
+        object_type_ids = set(
+            AuditTrail.objects.order_by()
+            .values_list('object_type_id', flat=True)
+            .distinct()
+        ) | set(
+            AuditLastSeen.objects.order_by()
+            .values_list('object_type_id', flat=True)
+            .distinct()
+        )
+        for object_type_id in object_type_ids:
+            with transaction.atomic():
+                AuditLastSeen.objects.refresh(object_type_id)
+            if options['verbosity'] > 1:
+                self.stdout.write(f'Rebuilt object type {object_type_id}...')
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Rebuilt last seen audit trail of {AuditLastSeen.objects.count()} objects.'
+            )
+        )
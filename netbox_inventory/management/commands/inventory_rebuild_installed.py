@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from netbox_inventory.models import Asset
+from netbox_inventory.utils import asset_refresh_installed
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild installed site, location, rack and device of all assets from '
+        'the hardware they are assigned to'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=10000,
+            help='Number of assets to update in a single query (default: 10000)',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        updated = 0
+        last_pk = 0
+        while True:
+            pks = list(
+                Asset.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:chunk_size]
+            )
+            if not pks:
+                break
+            updated += asset_refresh_installed(
+                Asset.objects.filter(pk__range=(pks[0], pks[-1]))
+            )
+            last_pk = pks[-1]
+            if options['verbosity'] > 1:
+                self.stdout.write(f'Updated {updated} assets...')
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt installed location of {updated} assets.')
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from netbox_inventory.models import LocationAssetCount
+
+
+class Command(BaseCommand):
+    help = 'Rebuild stored asset counts of all locations from assets'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            LocationAssetCount.objects.refresh()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Rebuilt asset counts of {LocationAssetCount.objects.count()} locations.'
+            )
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from netbox_inventory.models import Asset
+
+
+class Command(BaseCommand):
+    help = 'Rebuild search document of all assets, used by asset_search_document setting'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            Asset.objects.all().refresh_search_document()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Rebuilt search document of {Asset.objects.count()} assets.'
+            )
+        )
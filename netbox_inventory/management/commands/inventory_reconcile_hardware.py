@@ -0,0 +1,93 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from netbox_inventory.reconcile import (
+    HARDWARE_MODELS,
+    apply_hardware_fixes,
+    get_hardware_mismatches,
+)
+from netbox_inventory.utils import get_plugin_setting
+
+
+class Command(BaseCommand):
+    help = (
+        'Update serial, asset tag and type of devices, modules, inventory items '
+        'and racks to match their assigned assets'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report mismatches, make no changes',
+        )
+        parser.add_argument(
+            '--kind',
+            choices=HARDWARE_MODELS,
+            action='append',
+            help='Kind of hardware to reconcile (default: all)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of objects to update in a single query (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        if not options['dry_run'] and not get_plugin_setting(
+            'sync_hardware_serial_asset_tag'
+        ):
+            raise CommandError(
+                'sync_hardware_serial_asset_tag setting is not enabled, '
+                'use --dry-run to only report mismatches'
+            )
+
+        for kind in options['kind'] or HARDWARE_MODELS:
+            rows = get_hardware_mismatches(kind).iterator(
+                chunk_size=options['batch_size']
+            )
+            if options['dry_run']:
+                self._report(kind, rows, options['verbosity'])
+                continue
+            if options['verbosity'] > 1:
+                rows = self._print_rows(kind, rows)
+            updated = apply_hardware_fixes(kind, rows, options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'{kind}: {updated} updated'))
+
+    def _report(self, kind, rows, verbosity):
+        total = 0
+        field_counts = Counter()
+        for row in self._print_rows(kind, rows) if verbosity > 1 else rows:
+            total += 1
+            field_counts.update(self._changes(row))
+        message = f'{kind}: {total} mismatched'
+        if field_counts:
+            fields = ', '.join(f'{attname}: {n}' for attname, n in field_counts.items())
+            message += f' ({fields})'
+        self.stdout.write(message)
+
+    def _print_rows(self, kind, rows):
+        for row in rows:
+            changes = ', '.join(
+                f'{attname} {current!r} -> {expected!r}'
+                for attname, (current, expected) in self._changes(row).items()
+            )
+            self.stdout.write(f'{kind} {row["pk"]}: {changes}')
+            yield row
+
+    @staticmethod
+    def _changes(row):
+        """
+        Return dict of attname: (current, expected) for fields that differ in row.
+        """
+        changes = {}
+        for key, current in row.items():
+            if not key.startswith('current_'):
+                continue
+            attname = key.removeprefix('current_')
+            expected = row[f'expected_{attname}']
+            if current != expected:
+                changes[attname] = (current, expected)
+        return changes
@@ -1,15 +1,278 @@
-from django.db import models
+from collections import defaultdict
 
+from django.apps import apps
+from django.db import models, transaction
+from django.db.models import (
+    Count,
+    Exists,
+    F,
+    Max,
+    OuterRef,
+    Subquery,
+    prefetch_related_objects,
+)
+from django.db.models.functions import Coalesce, Greatest
+
+from core.choices import ObjectChangeActionChoices
+from dcim.models import Location
 from utilities.querysets import RestrictedQuerySet
 
+from .constants import ASSET_SEARCH_DOCUMENT_FIELDS, BULK_CREATE_BATCH_SIZE
+from .utils import bulk_log_changes, get_plugin_setting, has_event_rules
+
+
+class AssetQuerySet(RestrictedQuerySet):
+    def refresh_search_document(self):
+        """
+        Rebuild search_document of assets in queryset from their fields and names
+        of related objects. Custom fields listed in
+        `asset_custom_fields_search_filters` setting are included too.
+        """
+        custom_fields = list(get_plugin_setting('asset_custom_fields_search_filters'))
+        fields = ASSET_SEARCH_DOCUMENT_FIELDS + ('custom_field_data',)
+        rows = self.order_by().values_list(*fields)
+        batch = []
+        for row in rows.iterator(chunk_size=BULK_CREATE_BATCH_SIZE):
+            *values, custom_field_data = row
+            values += [(custom_field_data or {}).get(cf) for cf in custom_fields]
+            batch.append(
+                self.model(
+                    pk=row[0],
+                    search_document='\n'.join(
+                        str(value) for value in values if value not in (None, '')
+                    ).lower(),
+                )
+            )
+            if len(batch) >= BULK_CREATE_BATCH_SIZE:
+                self.model.objects.bulk_update(batch, ('search_document',))
+                batch = []
+        if batch:
+            self.model.objects.bulk_update(batch, ('search_document',))
+
+    def update_logged(self, **values):
+        """
+        Like update(), but also writes changelog records of updated assets. Assets
+        are updated in batches of BULK_CREATE_BATCH_SIZE, each with one UPDATE and
+        one INSERT of changelog records. Returns number of updated assets.
+
+        Falls back to saving assets one by one if event rules are enabled for
+        assets, as events are only triggered on save().
+        """
+        event_rules = has_event_rules(self.model)
+        pks = list(self.order_by('pk').values_list('pk', flat=True))
+        for start in range(0, len(pks), BULK_CREATE_BATCH_SIZE):
+            batch_pks = pks[start : start + BULK_CREATE_BATCH_SIZE]
+            batch = self.model.objects.filter(pk__in=batch_pks)
+            assets = list(batch)
+            for asset in assets:
+                asset.snapshot()
+                for field_name, value in values.items():
+                    setattr(asset, field_name, value)
+            with transaction.atomic(using=self.db):
+                if event_rules:
+                    for asset in assets:
+                        asset.save(using=self.db)
+                else:
+                    batch.update(**values)
+                    bulk_log_changes(assets, ObjectChangeActionChoices.ACTION_UPDATE)
+        return len(pks)
+
 
-class AssetManager(models.Manager.from_queryset(RestrictedQuerySet)):
+class AssetManager(models.Manager.from_queryset(AssetQuerySet)):
     def count_with_children(self):
-        """ """
+        """
+        Number of assets stored in related Location and its children, read from
+        LocationAssetCount.
+        """
         if hasattr(self, 'instance'):
-            assets = self.model.objects.filter(
-                storage_location__in=self.instance.get_descendants(include_self=True)
+            count = (
+                apps.get_model('netbox_inventory', 'LocationAssetCount')
+                .objects.filter(location=self.instance)
+                .values_list('count_with_children', flat=True)
+                .first()
+            )
+            return count or 0
+        return self.get_queryset().count()
+
+
+class AuditTrailQuerySet(RestrictedQuerySet):
+    def bulk_create_logged(self, audit_trails):
+        """
+        Insert audit_trails with bulk_create() and write their changelog records in
+        bulk. Changelog records carry the current user, so the auditor is still
+        shown for each audit trail.
+
+        Falls back to saving objects one by one if event rules are enabled for
+        audit trails, as events are only triggered on save().
+        """
+        audit_trails = list(audit_trails)
+        with transaction.atomic(using=self.db):
+            if has_event_rules(self.model):
+                for audit_trail in audit_trails:
+                    audit_trail.save(using=self.db)
+                return audit_trails
+
+            self.bulk_create(audit_trails, batch_size=BULK_CREATE_BATCH_SIZE)
+            # str(audit_trail) used in changelog needs the audited object
+            prefetch_related_objects(audit_trails, 'object')
+            bulk_log_changes(audit_trails, ObjectChangeActionChoices.ACTION_CREATE)
+            # post_save isn't sent by bulk_create()
+            apps.get_model('netbox_inventory', 'AuditLastSeen').objects.refresh_for(
+                audit_trails
+            )
+        return audit_trails
+
+
+class AuditLastSeenQuerySet(models.QuerySet):
+    def refresh_for(self, audit_trails):
+        """
+        Recalculate last seen rows of objects referenced by audit_trails.
+        """
+        object_ids = defaultdict(set)
+        for audit_trail in audit_trails:
+            object_ids[audit_trail.object_type_id].add(audit_trail.object_id)
+        for object_type_id, ids in object_ids.items():
+            self.refresh(object_type_id, ids)
+
+    def refresh(self, object_type_id, object_ids=None):
+        """
+        Recalculate last seen rows of objects of object_type_id from their audit
+        trails. If object_ids is None, all objects of that type are refreshed.
+        """
+        AuditTrail = self.model._meta.get_field('audit_trail').related_model
+        audit_trails = AuditTrail.objects.filter(object_type_id=object_type_id)
+        last_seen = self.filter(object_type_id=object_type_id)
+        if object_ids is not None:
+            audit_trails = audit_trails.filter(object_id__in=object_ids)
+            last_seen = last_seen.filter(object_id__in=object_ids)
+
+        # latest audit trail has the highest id, as created is set on insert
+        groups = (
+            audit_trails.order_by()
+            .values('object_id')
+            .annotate(count=Count('pk'), last_id=Max('pk'))
+        )
+        batch = []
+        for group in groups.iterator(chunk_size=BULK_CREATE_BATCH_SIZE):
+            batch.append(group)
+            if len(batch) >= BULK_CREATE_BATCH_SIZE:
+                self._upsert(object_type_id, batch, AuditTrail)
+                batch = []
+        if batch:
+            self._upsert(object_type_id, batch, AuditTrail)
+
+        # objects without any audit trails left
+        last_seen.exclude(
+            Exists(
+                AuditTrail.objects.filter(
+                    object_type_id=OuterRef('object_type_id'),
+                    object_id=OuterRef('object_id'),
+                )
             )
-        else:
-            assets = self.get_queryset()
-        return assets.count()
+        ).delete()
+
+    def _upsert(self, object_type_id, groups, audit_trail_model):
+        latest = audit_trail_model.objects.only('created', 'source_id').in_bulk(
+            [group['last_id'] for group in groups]
+        )
+        self.bulk_create(
+            [
+                self.model(
+                    object_type_id=object_type_id,
+                    object_id=group['object_id'],
+                    audit_trail_id=group['last_id'],
+                    created=latest[group['last_id']].created,
+                    source_id=latest[group['last_id']].source_id,
+                    count=group['count'],
+                )
+                for group in groups
+            ],
+            update_conflicts=True,
+            unique_fields=('object_type', 'object_id'),
+            update_fields=('audit_trail', 'created', 'source', 'count'),
+        )
+
+
+class LocationAssetCountQuerySet(models.QuerySet):
+    def adjust(self, location_id, delta):
+        """
+        Add delta to the stored asset count of Location with location_id and to
+        the count with children of that Location and all its ancestors.
+        """
+        if not location_id or not delta:
+            return
+        location_ids = list(
+            Location.objects.get(pk=location_id)
+            .get_ancestors(include_self=True)
+            .values_list('pk', flat=True)
+        )
+        self.bulk_create(
+            [self.model(location_id=pk) for pk in location_ids],
+            ignore_conflicts=True,
+        )
+        self.filter(location_id__in=location_ids).update(
+            count_with_children=Greatest(F('count_with_children') + delta, 0)
+        )
+        self.filter(location_id=location_id).update(
+            count=Greatest(F('count') + delta, 0)
+        )
+
+    def refresh(self, location_ids=None):
+        """
+        Recalculate asset counts of Locations with location_ids from assets. If
+        location_ids is None, counts of all Locations are refreshed.
+        """
+        Asset = apps.get_model('netbox_inventory', 'Asset')
+        locations = Location.objects.all()
+        if location_ids is not None:
+            locations = locations.filter(pk__in=location_ids)
+
+        direct = (
+            Asset.objects.filter(storage_location=OuterRef('pk'))
+            .order_by()
+            .values('storage_location')
+            .annotate(count=Count('pk'))
+            .values('count')
+        )
+        with_children = (
+            Asset.objects.filter(
+                storage_location__tree_id=OuterRef('tree_id'),
+                storage_location__lft__gte=OuterRef('lft'),
+                storage_location__rght__lte=OuterRef('rght'),
+            )
+            .order_by()
+            .values('storage_location__tree_id')
+            .annotate(count=Count('pk'))
+            .values('count')
+        )
+        counts = (
+            locations.order_by()
+            .annotate(
+                asset_count=Coalesce(Subquery(direct), 0),
+                asset_count_with_children=Coalesce(Subquery(with_children), 0),
+            )
+            .values_list('pk', 'asset_count', 'asset_count_with_children')
+        )
+        batch = []
+        for row in counts.iterator(chunk_size=BULK_CREATE_BATCH_SIZE):
+            batch.append(row)
+            if len(batch) >= BULK_CREATE_BATCH_SIZE:
+                self._upsert(batch)
+                batch = []
+        if batch:
+            self._upsert(batch)
+
+    def _upsert(self, rows):
+        self.bulk_create(
+            [
+                self.model(
+                    location_id=pk,
+                    count=count,
+                    count_with_children=count_with_children,
+                )
+                for pk, count, count_with_children in rows
+            ],
+            update_conflicts=True,
+            unique_fields=('location',),
+            update_fields=('count', 'count_with_children'),
+        )
@@ -0,0 +1,101 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import BigIntegerField, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_installed(apps, schema_editor):
+    Asset = apps.get_model('netbox_inventory', 'Asset')
+    Device = apps.get_model('dcim', 'Device')
+    Module = apps.get_model('dcim', 'Module')
+    InventoryItem = apps.get_model('dcim', 'InventoryItem')
+    Rack = apps.get_model('dcim', 'Rack')
+
+    def _hw_value(model, field_name, lookup):
+        return Subquery(
+            model.objects.filter(pk=OuterRef(field_name)).values(lookup)[:1]
+        )
+
+    def _installed(lookup, rack_lookup=None):
+        expressions = [
+            _hw_value(Device, 'device', lookup),
+            _hw_value(Module, 'module', f'device__{lookup}'),
+            _hw_value(InventoryItem, 'inventoryitem', f'device__{lookup}'),
+        ]
+        if rack_lookup:
+            expressions.append(_hw_value(Rack, 'rack', rack_lookup))
+        return Coalesce(*expressions, output_field=BigIntegerField())
+
+    Asset.objects.update(
+        installed_site=_installed('site', 'site'),
+        installed_location=_installed('location', 'location'),
+        installed_rack=_installed('rack', 'pk'),
+        installed_device=Coalesce(
+            F('device'),
+            _hw_value(Module, 'module', 'device'),
+            _hw_value(InventoryItem, 'inventoryitem', 'device'),
+            output_field=BigIntegerField(),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('netbox_inventory', '0020_asset_role'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='installed_device',
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name='+',
+                to='dcim.device',
+                verbose_name='Installed Device',
+            ),
+        ),
+        migrations.AddField(
+            model_name='asset',
+            name='installed_location',
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name='+',
+                to='dcim.location',
+                verbose_name='Installed Location',
+            ),
+        ),
+        migrations.AddField(
+            model_name='asset',
+            name='installed_rack',
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name='+',
+                to='dcim.rack',
+                verbose_name='Installed Rack',
+            ),
+        ),
+        migrations.AddField(
+            model_name='asset',
+            name='installed_site',
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name='+',
+                to='dcim.site',
+                verbose_name='Installed Site',
+            ),
+        ),
+        migrations.RunPython(populate_installed, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+from django.db import migrations, models
+
+
+def populate_kind(apps, schema_editor):
+    Asset = apps.get_model('netbox_inventory', 'Asset')
+
+    for kind in ('device', 'module', 'inventoryitem', 'rack'):
+        Asset.objects.filter(
+            kind='', **{f'{kind}_type__isnull': False}
+        ).update(kind=kind)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('netbox_inventory', '0021_asset_installed_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='kind',
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ('device', 'Device'),
+                    ('module', 'Module'),
+                    ('inventoryitem', 'Inventory Item'),
+                    ('rack', 'Rack'),
+                ],
+                db_index=True,
+                default='',
+                editable=False,
+                help_text='Kind of hardware, derived from hardware type',
+                max_length=30,
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(populate_kind, migrations.RunPython.noop),
+        migrations.AlterModelOptions(
+            name='asset',
+            options={
+                'ordering': (
+                    'kind',
+                    'device_type',
+                    'module_type',
+                    'inventoryitem_type',
+                    'rack_type',
+                    'serial',
+                )
+            },
+        ),
+    ]
@@ -0,0 +1,71 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+BATCH_SIZE = 1000
+
+
+def populate_last_seen(apps, schema_editor):
+    AuditTrail = apps.get_model('netbox_inventory', 'AuditTrail')
+    AuditLastSeen = apps.get_model('netbox_inventory', 'AuditLastSeen')
+
+    groups = (
+        AuditTrail.objects.order_by()
+        .values('object_type_id', 'object_id')
+        .annotate(count=Count('pk'), last_id=Max('pk'))
+    )
+    batch = []
+    for group in groups.iterator(chunk_size=BATCH_SIZE):
+        batch.append(group)
+        if len(batch) >= BATCH_SIZE:
+            _create_last_seen(AuditTrail, AuditLastSeen, batch)
+            batch = []
+    if batch:
+        _create_last_seen(AuditTrail, AuditLastSeen, batch)
+
+
+def _create_last_seen(AuditTrail, AuditLastSeen, groups):
+    latest = AuditTrail.objects.only('created', 'source_id').in_bulk(
+        [group['last_id'] for group in groups]
+    )
+    AuditLastSeen.objects.bulk_create(
+        [
+            AuditLastSeen(
+                object_type_id=group['object_type_id'],
+                object_id=group['object_id'],
+                audit_trail_id=group['last_id'],
+                created=latest[group['last_id']].created,
+                source_id=latest[group['last_id']].source_id,
+                count=group['count'],
+            )
+            for group in groups
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('netbox_inventory', '0022_asset_kind'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditLastSeen',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('created', models.DateTimeField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('audit_trail', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='netbox_inventory.audittrail')),
+                ('object_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype')),
+                ('source', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='netbox_inventory.audittrailsource')),
+            ],
+            options={
+                'verbose_name': 'audit last seen',
+                'verbose_name_plural': 'audit last seen',
+                'constraints': [models.UniqueConstraint(fields=('object_type', 'object_id'), name='unique_auditlastseen_object')],
+            },
+        ),
+        migrations.RunPython(populate_last_seen, migrations.RunPython.noop),
+    ]
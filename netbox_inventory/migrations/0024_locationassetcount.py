@@ -0,0 +1,76 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 1000
+
+
+def populate_location_asset_counts(apps, schema_editor):
+    Asset = apps.get_model('netbox_inventory', 'Asset')
+    Location = apps.get_model('dcim', 'Location')
+    LocationAssetCount = apps.get_model('netbox_inventory', 'LocationAssetCount')
+
+    direct = (
+        Asset.objects.filter(storage_location=OuterRef('pk'))
+        .order_by()
+        .values('storage_location')
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    with_children = (
+        Asset.objects.filter(
+            storage_location__tree_id=OuterRef('tree_id'),
+            storage_location__lft__gte=OuterRef('lft'),
+            storage_location__rght__lte=OuterRef('rght'),
+        )
+        .order_by()
+        .values('storage_location__tree_id')
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    counts = (
+        Location.objects.order_by()
+        .annotate(
+            asset_count=Coalesce(Subquery(direct), 0),
+            asset_count_with_children=Coalesce(Subquery(with_children), 0),
+        )
+        .values_list('pk', 'asset_count', 'asset_count_with_children')
+    )
+    batch = []
+    for pk, count, count_with_children in counts.iterator(chunk_size=BATCH_SIZE):
+        batch.append(
+            LocationAssetCount(
+                location_id=pk,
+                count=count,
+                count_with_children=count_with_children,
+            )
+        )
+        if len(batch) >= BATCH_SIZE:
+            LocationAssetCount.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        LocationAssetCount.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('netbox_inventory', '0023_auditlastseen'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocationAssetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('count_with_children', models.PositiveIntegerField(default=0)),
+                ('location', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='dcim.location')),
+            ],
+            options={
+                'verbose_name': 'location asset count',
+                'verbose_name_plural': 'location asset counts',
+            },
+        ),
+        migrations.RunPython(populate_location_asset_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+from django.db import migrations, models
+
+import netbox_inventory.utils
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('netbox_inventory', '0025_asset_search_document'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='asset',
+            name='device',
+            field=models.OneToOneField(
+                blank=True,
+                null=True,
+                on_delete=netbox_inventory.utils.release_assigned_asset,
+                related_name='assigned_asset',
+                to='dcim.device',
+            ),
+        ),
+        migrations.AlterField(
+            model_name='asset',
+            name='inventoryitem',
+            field=models.OneToOneField(
+                blank=True,
+                null=True,
+                on_delete=netbox_inventory.utils.release_assigned_asset,
+                related_name='assigned_asset',
+                to='dcim.inventoryitem',
+                verbose_name='Inventory Item',
+            ),
+        ),
+        migrations.AlterField(
+            model_name='asset',
+            name='module',
+            field=models.OneToOneField(
+                blank=True,
+                null=True,
+                on_delete=netbox_inventory.utils.release_assigned_asset,
+                related_name='assigned_asset',
+                to='dcim.module',
+            ),
+        ),
+        migrations.AlterField(
+            model_name='asset',
+            name='rack',
+            field=models.OneToOneField(
+                blank=True,
+                null=True,
+                on_delete=netbox_inventory.utils.release_assigned_asset,
+                related_name='assigned_asset',
+                to='dcim.rack',
+            ),
+        ),
+    ]
@@ -1,19 +1,22 @@
 from datetime import date
 
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 from django.forms import ValidationError
 
 from netbox.models import NestedGroupModel
 from netbox.models.features import ImageAttachmentsMixin
 
 from ..choices import AssetStatusChoices, HardwareKindChoices
-from ..managers import AssetManager
+from ..managers import AssetManager, LocationAssetCountQuerySet
 from ..utils import (
     asset_clear_old_hw,
     asset_set_new_hw,
     get_plugin_setting,
     get_prechange_field,
     get_status_for,
+    release_assigned_asset,
 )
 from .mixins import NamedModel
 
@@ -161,6 +164,14 @@ class Asset(NamedModel, ImageAttachmentsMixin):
     #
     # hardware type fields
     #
+    kind = models.CharField(
+        max_length=30,
+        choices=HardwareKindChoices,
+        blank=True,
+        editable=False,
+        db_index=True,
+        help_text='Kind of hardware, derived from hardware type',
+    )
     device_type = models.ForeignKey(
         to='dcim.DeviceType',
         on_delete=models.PROTECT,
@@ -199,21 +210,21 @@ class Asset(NamedModel, ImageAttachmentsMixin):
     #
     device = models.OneToOneField(
         to='dcim.Device',
-        on_delete=models.SET_NULL,
+        on_delete=release_assigned_asset,
         related_name='assigned_asset',
         blank=True,
         null=True,
     )
     module = models.OneToOneField(
         to='dcim.Module',
-        on_delete=models.SET_NULL,
+        on_delete=release_assigned_asset,
         related_name='assigned_asset',
         blank=True,
         null=True,
     )
     inventoryitem = models.OneToOneField(
         to='dcim.InventoryItem',
-        on_delete=models.SET_NULL,
+        on_delete=release_assigned_asset,
         related_name='assigned_asset',
         blank=True,
         null=True,
@@ -221,7 +232,7 @@ class Asset(NamedModel, ImageAttachmentsMixin):
     )
     rack = models.OneToOneField(
         to='dcim.Rack',
-        on_delete=models.SET_NULL,
+        on_delete=release_assigned_asset,
         related_name='assigned_asset',
         blank=True,
         null=True,
@@ -253,6 +264,46 @@ class Asset(NamedModel, ImageAttachmentsMixin):
         verbose_name='Storage Location',
     )
 
+    #
+    # installed location fields, derived from assigned hardware
+    #
+    installed_site = models.ForeignKey(
+        to='dcim.Site',
+        on_delete=models.SET_NULL,
+        related_name='+',
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name='Installed Site',
+    )
+    installed_location = models.ForeignKey(
+        to='dcim.Location',
+        on_delete=models.SET_NULL,
+        related_name='+',
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name='Installed Location',
+    )
+    installed_rack = models.ForeignKey(
+        to='dcim.Rack',
+        on_delete=models.SET_NULL,
+        related_name='+',
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name='Installed Rack',
+    )
+    installed_device = models.ForeignKey(
+        to='dcim.Device',
+        on_delete=models.SET_NULL,
+        related_name='+',
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name='Installed Device',
+    )
+
     #
     # purchase info
     #
@@ -293,6 +344,13 @@ class Asset(NamedModel, ImageAttachmentsMixin):
         verbose_name='Warranty End',
     )
 
+    # lower-cased text of searched fields, see asset_search_document setting
+    search_document = models.TextField(
+        blank=True,
+        default='',
+        editable=False,
+    )
+
     clone_fields = [
         'name',
         'asset_tag',
@@ -311,21 +369,6 @@ class Asset(NamedModel, ImageAttachmentsMixin):
         'comments',
     ]
 
-    @property
-    def kind(self):
-        if self.device_type_id:
-            return 'device'
-        elif self.module_type_id:
-            return 'module'
-        elif self.inventoryitem_type_id:
-            return 'inventoryitem'
-        elif self.rack_type_id:
-            return 'rack'
-        assert False, f'Invalid hardware kind detected for asset {self.pk}'
-
-    def get_kind_display(self):
-        return dict(HardwareKindChoices)[self.kind]
-
     @property
     def hardware_type(self):
         return (
@@ -345,41 +388,6 @@ class Asset(NamedModel, ImageAttachmentsMixin):
         if self.storage_location:
             return self.storage_location.site
 
-    @property
-    def installed_site(self):
-        device = self.installed_device
-        if device:
-            return device.site
-        if self.rack:
-            return self.rack.site
-
-    @property
-    def installed_location(self):
-        device = self.installed_device
-        if device:
-            return device.location
-        if self.rack:
-            return self.rack.location
-
-    @property
-    def installed_rack(self):
-        device = self.installed_device
-        if device:
-            return device.rack
-        if self.rack:
-            return self.rack
-
-    @property
-    def installed_device(self):
-        if self.kind == 'rack':
-            return None
-        elif self.kind == 'device':
-            return self.device
-        elif self.hardware:
-            return self.hardware.device
-        else:
-            return None
-
     @property
     def current_site(self):
         installed = self.installed_site
@@ -444,39 +452,39 @@ class Asset(NamedModel, ImageAttachmentsMixin):
         return super().clean()
 
     def save(self, clear_old_hw=True, *args, **kwargs):
+        self.update_kind()
         self.update_hardware_used(clear_old_hw)
+        self.update_installed()
         return super().save(*args, **kwargs)
 
     def validate_hardware_types(self):
         """
         Ensure only one device/module_type/inventoryitem_type/rack_type is set at a time.
         """
-        if (
-            sum(
-                map(
-                    bool,
-                    [
-                        self.device_type,
-                        self.module_type,
-                        self.inventoryitem_type,
-                        self.rack_type,
-                    ],
-                )
-            )
-            > 1
-        ):
+        kinds = [
+            kind
+            for kind in HardwareKindChoices.values()
+            if getattr(self, f'{kind}_type_id')
+        ]
+        if len(kinds) > 1:
             raise ValidationError(
                 'Only one of device type, module type inventory item type and rack type can be set for the same asset.'
             )
-        if (
-            not self.device_type
-            and not self.module_type
-            and not self.inventoryitem_type
-            and not self.rack_type
-        ):
+        if not kinds:
             raise ValidationError(
                 'One of device type, module type, inventory item type or rack type must be set.'
             )
+        self.kind = kinds[0]
+
+    def update_kind(self):
+        """
+        Set kind based on which of device/module_type/inventoryitem_type/rack_type
+        is set.
+        """
+        for kind in HardwareKindChoices.values():
+            if getattr(self, f'{kind}_type_id'):
+                self.kind = kind
+                return
 
     def validate_hardware(self):
         """
@@ -553,6 +561,30 @@ class Asset(NamedModel, ImageAttachmentsMixin):
             if new_hw:
                 asset_set_new_hw(asset=self, hw=new_hw)
 
+    def update_installed(self):
+        """
+        Set installed_site, installed_location, installed_rack and installed_device
+        based on hardware this asset is assigned to.
+        """
+        device = self.device
+        if not device and (self.module or self.inventoryitem):
+            device = (self.module or self.inventoryitem).device
+        if device:
+            self.installed_device = device
+            self.installed_site_id = device.site_id
+            self.installed_location_id = device.location_id
+            self.installed_rack_id = device.rack_id
+        elif self.rack:
+            self.installed_device = None
+            self.installed_site_id = self.rack.site_id
+            self.installed_location_id = self.rack.location_id
+            self.installed_rack = self.rack
+        else:
+            self.installed_device = None
+            self.installed_site = None
+            self.installed_location = None
+            self.installed_rack = None
+
     def clean_delivery(self):
         if self.delivery and self.delivery.purchase != self.purchase:
             raise ValidationError(
@@ -580,12 +612,29 @@ class Asset(NamedModel, ImageAttachmentsMixin):
 
     class Meta:
         ordering = (
+            'kind',
             'device_type',
             'module_type',
             'inventoryitem_type',
             'rack_type',
             'serial',
         )
+        indexes = (
+            GinIndex(
+                fields=('search_document',),
+                opclasses=('gin_trgm_ops',),
+                name='inventory_asset_search_trgm',
+            ),
+            # serial__isw and asset_tag__isw lookups
+            models.Index(
+                OpClass(Upper('serial'), name='text_pattern_ops'),
+                name='inventory_asset_serial_upper',
+            ),
+            models.Index(
+                OpClass(Upper('asset_tag'), name='text_pattern_ops'),
+                name='inventory_asset_tag_upper',
+            ),
+        )
         constraints = (
             models.UniqueConstraint(
                 fields=('device_type', 'serial'),
@@ -614,3 +663,33 @@ class Asset(NamedModel, ImageAttachmentsMixin):
                 violation_error_message='Asset with this Asset Tag and no Owning Tenant already exists.',
             ),
         )
+
+
+class LocationAssetCount(models.Model):
+    """
+    A `LocationAssetCount` holds the number of Assets stored in a Location, both
+    directly and in the Location and all its children. It is updated when Assets
+    are saved or deleted and when Locations are moved in the tree, so counts can
+    be shown in Location lists without counting assets of each subtree.
+    """
+
+    location = models.OneToOneField(
+        to='dcim.Location',
+        related_name='+',
+        on_delete=models.CASCADE,
+    )
+    count = models.PositiveIntegerField(
+        default=0,
+    )
+    count_with_children = models.PositiveIntegerField(
+        default=0,
+    )
+
+    objects = LocationAssetCountQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'location asset count'
+        verbose_name_plural = 'location asset counts'
+
+    def __str__(self) -> str:
+        return str(self.location)
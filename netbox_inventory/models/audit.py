@@ -21,12 +21,14 @@ from utilities.querysets import RestrictedQuerySet
 from utilities.views import get_viewname
 
 from ..constants import AUDITFLOW_OBJECT_TYPE_CHOICES
+from ..managers import AuditLastSeenQuerySet, AuditTrailQuerySet
 from .mixins import NamedModel
 
 __all__ = (
     'AuditFlow',
     'AuditFlowPage',
     'AuditFlowPageAssignment',
+    'AuditLastSeen',
     'AuditTrail',
     'AuditTrailSource',
 )
@@ -388,7 +390,7 @@ class AuditTrail(
         object_id_field='changed_object_id',
     )
 
-    objects = RestrictedQuerySet.as_manager()
+    objects = AuditTrailQuerySet.as_manager()
 
     class Meta:
         ordering = (
@@ -410,3 +412,50 @@ class AuditTrail(
     def get_absolute_url(self) -> None:
         # Audit trails are only visible in the list view.
         return None
+
+
+class AuditLastSeen(models.Model):
+    """
+    An `AuditLastSeen` holds the most recent `AuditTrail` of an object and the number of
+    its audit trails. It is maintained automatically when audit trails are created or
+    deleted, so the last audit of an object can be looked up without scanning the
+    whole audit trail history.
+    """
+
+    object_type = models.ForeignKey(
+        to=ContentType,
+        related_name='+',
+        on_delete=models.CASCADE,
+    )
+    object_id = models.PositiveBigIntegerField()
+    audit_trail = models.ForeignKey(
+        to=AuditTrail,
+        related_name='+',
+        on_delete=models.CASCADE,
+    )
+    created = models.DateTimeField()
+    source = models.ForeignKey(
+        to=AuditTrailSource,
+        related_name='+',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+    )
+    count = models.PositiveIntegerField(
+        default=0,
+    )
+
+    objects = AuditLastSeenQuerySet.as_manager()
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('object_type', 'object_id'),
+                name='unique_auditlastseen_object',
+            ),
+        )
+        verbose_name = _('audit last seen')
+        verbose_name_plural = _('audit last seen')
+
+    def __str__(self) -> str:
+        return str(self.audit_trail)
@@ -0,0 +1,128 @@
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import F, IntegerField, Q, Value
+from django.db.models.functions import Coalesce
+
+from core.choices import ObjectChangeActionChoices
+from dcim.models import Device, InventoryItem, Module, Rack
+from netbox.search.backends import search_backend
+
+from .constants import BULK_CREATE_BATCH_SIZE
+from .utils import bulk_log_changes
+
+__all__ = (
+    'HARDWARE_MODELS',
+    'apply_hardware_fixes',
+    'get_hardware_mismatches',
+    'get_hardware_sync_fields',
+)
+
+HARDWARE_MODELS = {
+    'device': Device,
+    'module': Module,
+    'inventoryitem': InventoryItem,
+    'rack': Rack,
+}
+
+
+def get_hardware_sync_fields(kind):
+    """
+    Return dict of hardware field attname to expression of the value it should
+    have, based on assigned asset. Same fields as synced by asset_set_new_hw().
+    Expressions are relative to hardware model and never NULL, so they can be
+    compared directly.
+    """
+    fields = {
+        'serial': (
+            Coalesce('serial', Value('')),
+            Coalesce('assigned_asset__serial', Value('')),
+        ),
+        'asset_tag': (
+            Coalesce('asset_tag', Value('')),
+            Coalesce('assigned_asset__asset_tag', Value('')),
+        ),
+    }
+    if kind in ('device', 'module', 'rack'):
+        # rack type is optional
+        fields[f'{kind}_type_id'] = (
+            Coalesce(f'{kind}_type', Value(0), output_field=IntegerField()),
+            Coalesce(
+                f'assigned_asset__{kind}_type',
+                Value(0),
+                output_field=IntegerField(),
+            ),
+        )
+    if kind == 'inventoryitem':
+        # only synced if asset has an inventory item type, otherwise expected
+        # value falls back to current one
+        fields['manufacturer_id'] = (
+            Coalesce('manufacturer', Value(0), output_field=IntegerField()),
+            Coalesce(
+                'assigned_asset__inventoryitem_type__manufacturer',
+                'manufacturer',
+                Value(0),
+                output_field=IntegerField(),
+            ),
+        )
+        fields['part_id'] = (
+            Coalesce('part_id', Value('')),
+            Coalesce(
+                'assigned_asset__inventoryitem_type__part_number',
+                'part_id',
+                Value(''),
+            ),
+        )
+    return fields
+
+
+def get_hardware_mismatches(kind):
+    """
+    Return queryset of values for hardware of kind whose synced fields differ from
+    its assigned asset. Each row has pk, and current_<attname> and
+    expected_<attname> for every synced field.
+    """
+    annotations = {}
+    mismatch = Q()
+    for attname, (current, expected) in get_hardware_sync_fields(kind).items():
+        annotations[f'current_{attname}'] = current
+        annotations[f'expected_{attname}'] = expected
+        mismatch |= ~Q(**{f'current_{attname}': F(f'expected_{attname}')})
+    return (
+        HARDWARE_MODELS[kind]
+        .objects.filter(assigned_asset__isnull=False)
+        .annotate(**annotations)
+        .filter(mismatch)
+        .order_by('pk')
+        .values('pk', *annotations)
+    )
+
+
+def apply_hardware_fixes(kind, rows, batch_size=BULK_CREATE_BATCH_SIZE):
+    """
+    Update hardware in rows (as returned by get_hardware_mismatches) to match
+    assigned assets, one batch at a time with bulk_update(). Rows may be an
+    iterator, so they don't all have to be loaded at once. Changelog records are
+    written in bulk as well. Returns number of updated objects.
+    """
+    model = HARDWARE_MODELS[kind]
+    attnames = list(get_hardware_sync_fields(kind))
+    updated = 0
+    rows = iter(rows)
+    while batch := {row['pk']: row for row in islice(rows, batch_size)}:
+        objects = list(model.objects.filter(pk__in=batch))
+        for obj in objects:
+            obj.snapshot()
+            for attname in attnames:
+                value = batch[obj.pk][f'expected_{attname}']
+                if attname in ('asset_tag', 'manufacturer_id', f'{kind}_type_id'):
+                    # hardware needs None for blank asset_tag to enforce uniqueness,
+                    # 0 stands for no related object
+                    value = value or None
+                setattr(obj, attname, value)
+        with transaction.atomic():
+            model.objects.bulk_update(objects, attnames)
+            bulk_log_changes(objects, ObjectChangeActionChoices.ACTION_UPDATE)
+        search_backend.cache(objects)
+        updated += len(objects)
+    return updated
@@ -1,79 +1,328 @@
-import logging
-
-from django.db.models.signals import post_save, pre_delete, pre_save
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
-from dcim.models import Device, InventoryItem, Module, Rack
-from utilities.exceptions import AbortRequest
-
-from .models import Asset, Delivery
-from .utils import get_plugin_setting, get_status_for, is_equal_none
+from dcim.models import (
+    Device,
+    DeviceType,
+    InventoryItem,
+    Location,
+    Manufacturer,
+    Module,
+    ModuleType,
+    Rack,
+    RackType,
+)
+from tenancy.models import Tenant
 
-logger = logging.getLogger('netbox.netbox_inventory.signals')
+from .models import (
+    Asset,
+    AuditLastSeen,
+    AuditTrail,
+    Delivery,
+    InventoryItemGroup,
+    InventoryItemType,
+    LocationAssetCount,
+    Purchase,
+    Supplier,
+)
+from .utils import (
+    asset_refresh_installed,
+    get_plugin_setting,
+    invalidate_asset_stats,
+    is_equal_none,
+    serial_asset_tag_changed,
+    serial_asset_tag_error,
+    serial_asset_tag_guard_suppressed,
+)
 
 
 @receiver(pre_save, sender=Device)
 @receiver(pre_save, sender=Module)
 @receiver(pre_save, sender=InventoryItem)
 @receiver(pre_save, sender=Rack)
-def prevent_update_serial_asset_tag(instance, **kwargs):
+def prevent_update_serial_asset_tag(instance, update_fields=None, **kwargs):
     """
     When a hardware (Device, Module, InventoryItem, Rack) has an Asset assigned and
     user changes serial or asset_tag on hardware, prevent that change
     and inform that change must be made on Asset instance instead.
 
-    Only enforces if `sync_hardware_serial_asset_tag` setting is true.
+    Only enforces if `sync_hardware_serial_asset_tag` setting is true and not
+    inside suppress_serial_asset_tag_guard().
+
+    Runs on every hardware save, so the assigned asset is only looked up if
+    serial or asset tag may have changed.
     """
+    if not get_plugin_setting('sync_hardware_serial_asset_tag'):
+        # don't enforce if sync not enabled
+        return
+    if not instance.pk or serial_asset_tag_guard_suppressed():
+        return
+    if update_fields is not None and not {'serial', 'asset_tag'} & set(update_fields):
+        return
+    if not serial_asset_tag_changed(instance):
+        return
     try:
         # will raise RelatedObjectDoesNotExist if not set
         asset = instance.assigned_asset
     except Asset.DoesNotExist:
         return
-    if not get_plugin_setting('sync_hardware_serial_asset_tag'):
-        # don't enforce if sync not enabled
+    if not is_equal_none(asset.serial, instance.serial) or not is_equal_none(
+        asset.asset_tag, instance.asset_tag
+    ):
+        raise serial_asset_tag_error(asset.kind)
+
+
+@receiver(post_save, sender=Delivery)
+def handle_delivery_purchase_change(instance, created, **kwargs):
+    """
+    Update child Assets if Delivery Purchase has changed.
+    """
+    if created or not _fields_changed(instance, ('purchase',)):
         return
-    if instance.pk and (
-        not is_equal_none(asset.serial, instance.serial)
-        or not is_equal_none(asset.asset_tag, instance.asset_tag)
+    assets = Asset.objects.filter(delivery=instance).exclude(
+        purchase=instance.purchase_id
+    )
+    if assets.update_logged(purchase=instance.purchase) and get_plugin_setting(
+        'asset_search_document'
     ):
-        raise AbortRequest(
-            f'Cannot change {asset.kind} serial and asset tag if asset is assigned. Please update via inventory > asset instead.'
+        Asset.objects.filter(delivery=instance).refresh_search_document()
+
+
+def _fields_changed(instance, field_names):
+    """
+    Compare FK fields on instance to its prechange snapshot. If there is no
+    snapshot we can't know, so we assume they changed.
+    """
+    snapshot = getattr(instance, '_prechange_snapshot', None)
+    if not snapshot:
+        return True
+    return any(
+        snapshot.get(field_name) != getattr(instance, f'{field_name}_id')
+        for field_name in field_names
+    )
+
+
+@receiver(post_save, sender=Device)
+def update_installed_device(instance, created, **kwargs):
+    """
+    Keep installed_* fields of Assets installed in Device in sync when
+    Device is moved to another site, location or rack.
+    """
+    if created or not _fields_changed(instance, ('site', 'location', 'rack')):
+        return
+    transaction.on_commit(invalidate_asset_stats)
+    Asset.objects.filter(installed_device=instance).update(
+        installed_site=instance.site_id,
+        installed_location=instance.location_id,
+        installed_rack=instance.rack_id,
+    )
+
+
+@receiver(post_save, sender=Module)
+@receiver(post_save, sender=InventoryItem)
+def update_installed_component(instance, created, **kwargs):
+    """
+    Keep installed_* fields of Asset assigned to Module or InventoryItem in sync
+    when it is moved to another device.
+    """
+    if created or not _fields_changed(instance, ('device',)):
+        return
+    kind = 'module' if isinstance(instance, Module) else 'inventoryitem'
+    transaction.on_commit(invalidate_asset_stats)
+    asset_refresh_installed(Asset.objects.filter(**{kind: instance}))
+
+
+@receiver(post_save, sender=Rack)
+def update_installed_rack(instance, created, **kwargs):
+    """
+    Keep installed_* fields of Assets installed in Rack (including devices
+    in that rack) in sync when Rack is moved to another site or location.
+    """
+    if created or not _fields_changed(instance, ('site', 'location')):
+        return
+    transaction.on_commit(invalidate_asset_stats)
+    Asset.objects.filter(installed_rack=instance).update(
+        installed_site=instance.site_id,
+        installed_location=instance.location_id,
+    )
+
+
+@receiver(post_save, sender=Location)
+def update_installed_location(instance, created, **kwargs):
+    """
+    Keep installed_site of Assets installed in Location (or its children) in
+    sync when Location is moved to another site.
+    """
+    if created or not _fields_changed(instance, ('site',)):
+        return
+    transaction.on_commit(invalidate_asset_stats)
+    Asset.objects.filter(
+        installed_location__in=instance.get_descendants(include_self=True)
+    ).update(installed_site=instance.site_id)
+
+
+@receiver(post_save, sender=Asset)
+@receiver(post_delete, sender=Asset)
+@receiver(post_save, sender=InventoryItemType)
+@receiver(post_delete, sender=InventoryItemType)
+@receiver(post_save, sender=InventoryItemGroup)
+@receiver(post_delete, sender=InventoryItemGroup)
+@receiver(post_save, sender=Manufacturer)
+def asset_changed(**kwargs):
+    """
+    Drop cached asset statistics shown on object detail pages. Done on commit,
+    so concurrent requests can't cache counts from before the change again.
+    """
+    transaction.on_commit(invalidate_asset_stats)
+
+
+def _stored_value(instance, field_name):
+    """
+    Return value of FK field as stored in database. Taken from prechange
+    snapshot if there is one, otherwise queried.
+    """
+    snapshot = getattr(instance, '_prechange_snapshot', None)
+    if snapshot and field_name in snapshot:
+        return snapshot[field_name]
+    return (
+        type(instance)
+        .objects.filter(pk=instance.pk)
+        .values_list(field_name, flat=True)
+        .first()
+    )
+
+
+@receiver(pre_save, sender=Asset)
+def store_prechange_storage_location(instance, raw=False, **kwargs):
+    """
+    Remember storage_location of Asset as stored in database, so we know which
+    LocationAssetCount to update after save.
+    """
+    instance._prechange_storage_location_id = None
+    if instance.pk and not raw:
+        instance._prechange_storage_location_id = _stored_value(
+            instance, 'storage_location'
         )
 
 
-@receiver(pre_delete, sender=Device)
-@receiver(pre_delete, sender=Module)
-@receiver(pre_delete, sender=InventoryItem)
-@receiver(pre_delete, sender=Rack)
-def free_assigned_asset(instance, **kwargs):
+@receiver(post_save, sender=Asset)
+def update_location_asset_count(instance, raw=False, **kwargs):
+    """
+    Keep LocationAssetCount in sync when Asset is moved between storage locations.
     """
-    If a hardware (Device, Module, InventoryItem, Rack) has an Asset assigned and
-    that hardware is deleted, update Asset.status to stored_status.
+    if raw:
+        return
+    old_location_id = getattr(instance, '_prechange_storage_location_id', None)
+    if old_location_id == instance.storage_location_id:
+        return
+    LocationAssetCount.objects.adjust(old_location_id, -1)
+    LocationAssetCount.objects.adjust(instance.storage_location_id, 1)
+
+
+@receiver(post_delete, sender=Asset)
+def delete_location_asset_count(instance, **kwargs):
+    """
+    Keep LocationAssetCount in sync when Asset is deleted.
+    """
+    LocationAssetCount.objects.adjust(instance.storage_location_id, -1)
+
 
-    Netbox handles deletion in a DB transaction, so if deletion failes for any
-    reason, this status change will also be reverted.
+@receiver(pre_save, sender=Location)
+def store_prechange_location_parent(instance, raw=False, **kwargs):
+    """
+    Remember parent of Location as stored in database, so we know if Location
+    was moved in the tree.
+    """
+    instance._prechange_parent_id = None
+    if instance.pk and not raw:
+        instance._prechange_parent_id = _stored_value(instance, 'parent')
+
+
+@receiver(post_save, sender=Location)
+def update_moved_location_asset_count(instance, created, raw=False, **kwargs):
+    """
+    When Location is moved to another parent, assets in it are no longer counted
+    in its old ancestors and are now counted in its new ancestors.
     """
-    stored_status = get_status_for('stored')
-    if not stored_status:
+    old_parent_id = getattr(instance, '_prechange_parent_id', None)
+    if created or raw or old_parent_id == instance.parent_id:
         return
-    try:
-        # will raise RelatedObjectDoesNotExist if not set
-        asset = instance.assigned_asset
-    except Asset.DoesNotExist:
+    location_ids = set()
+    for parent_id in (old_parent_id, instance.parent_id):
+        if parent_id:
+            # tree fields of cached parent objects are stale after the move
+            location_ids.update(
+                Location.objects.get(pk=parent_id)
+                .get_ancestors(include_self=True)
+                .values_list('pk', flat=True)
+            )
+    LocationAssetCount.objects.refresh(location_ids)
+
+
+@receiver(post_save, sender=Asset)
+def update_asset_search_document(instance, raw=False, **kwargs):
+    """
+    Rebuild search document of saved Asset if `asset_search_document` is enabled.
+    """
+    if raw or not get_plugin_setting('asset_search_document'):
         return
-    asset.snapshot()
-    asset.status = stored_status
-    # also unassign that item from asset
-    setattr(asset, asset.kind, None)
-    asset.full_clean()
-    asset.save(clear_old_hw=False)
-    logger.info(f'Asset marked as stored {asset}')
+    Asset.objects.filter(pk=instance.pk).refresh_search_document()
 
 
-@receiver(post_save, sender=Delivery)
-def handle_delivery_purchase_change(instance, created, **kwargs):
+# related object name fields included in asset search document
+SEARCH_DOCUMENT_RELATED = {
+    DeviceType: (('model',), ('device_type',)),
+    ModuleType: (('model',), ('module_type',)),
+    InventoryItemType: (('model',), ('inventoryitem_type',)),
+    RackType: (('model',), ('rack_type',)),
+    Device: (('name',), ('device',)),
+    InventoryItem: (('name',), ('inventoryitem',)),
+    Rack: (('name',), ('rack',)),
+    Delivery: (('name',), ('delivery',)),
+    # supplier name of purchase is part of search document too
+    Purchase: (('name', 'supplier'), ('purchase',)),
+    Supplier: (('name',), ('purchase__supplier',)),
+    Tenant: (('name',), ('tenant', 'owning_tenant')),
+}
+
+
+def update_related_search_document(sender, instance, created, raw=False, **kwargs):
     """
-    Update child Assets if Delivery Purchase has changed.
+    Rebuild search documents of Assets related to instance if any of its fields
+    used in search document changed.
+    """
+    if created or raw or not get_plugin_setting('asset_search_document'):
+        return
+    field_names, lookups = SEARCH_DOCUMENT_RELATED[sender]
+    snapshot = getattr(instance, '_prechange_snapshot', None)
+    if snapshot and all(
+        snapshot.get(field_name)
+        == getattr(instance, instance._meta.get_field(field_name).attname)
+        for field_name in field_names
+    ):
+        return
+    query = Q()
+    for lookup in lookups:
+        query |= Q(**{lookup: instance})
+    Asset.objects.filter(query).refresh_search_document()
+
+
+for model in SEARCH_DOCUMENT_RELATED:
+    post_save.connect(update_related_search_document, sender=model)
+
+
+@receiver(post_save, sender=AuditTrail)
+@receiver(post_delete, sender=AuditTrail)
+def update_audit_last_seen(instance, **kwargs):
+    """
+    Keep AuditLastSeen of audited object in sync with its audit trails.
     """
-    if not created:
-        Asset.objects.filter(delivery=instance).update(purchase=instance.purchase)
+    objects = {(instance.object_type_id, instance.object_id)}
+    # edited audit trail may have been moved from another object
+    prechange = getattr(instance, '_prechange_snapshot', None) or {}
+    if prechange.get('object_id') is not None:
+        objects.add((prechange['object_type'], prechange['object_id']))
+    for object_type_id, object_id in objects:
+        AuditLastSeen.objects.refresh(object_type_id, [object_id])
@@ -1,4 +1,5 @@
 import django_tables2 as tables
+from django.db.models import Count, OuterRef, Subquery
 from django.db.models.functions import Coalesce
 from django.utils.translation import gettext_lazy as _
 
@@ -124,7 +125,7 @@ class AssetTable(PrimaryModelTable):
     )
     kind = tables.Column(
         accessor='get_kind_display',
-        orderable=False,
+        order_by=('kind',),
     )
     manufacturer = tables.Column(
         accessor='hardware_type__manufacturer',
@@ -290,64 +291,39 @@ class AssetTable(PrimaryModelTable):
         )
         return (queryset, True)
 
-    def _order_annotate_installed(self, queryset):
-        return queryset.annotate(
-            site_name=Coalesce(
-                'device__site__name',
-                'module__device__site__name',
-                'inventoryitem__device__site__name',
-                'rack__site__name',
-            ),
-            location_name=Coalesce(
-                'device__location__name',
-                'module__device__location__name',
-                'inventoryitem__device__location__name',
-                'rack__location__name',
-            ),
-            rack_name=Coalesce(
-                'device__rack__name',
-                'module__device__rack__name',
-                'inventoryitem__device__rack__name',
-                'rack__name',
-            ),
-            device_name=Coalesce(
-                'device__name', 'module__device__name', 'inventoryitem__device__name'
-            ),
-        )
-
     def order_installed_site(self, queryset, is_descending):
-        queryset = self._order_annotate_installed(queryset).order_by(
-            ('-' if is_descending else '') + 'site_name',
-            ('-' if is_descending else '') + 'device_name',
+        queryset = queryset.order_by(
+            ('-' if is_descending else '') + 'installed_site__name',
+            ('-' if is_descending else '') + 'installed_device__name',
             ('-' if is_descending else '') + 'module__module_bay',
             ('-' if is_descending else '') + 'serial',
         )
         return (queryset, True)
 
     def order_installed_location(self, queryset, is_descending):
-        queryset = self._order_annotate_installed(queryset).order_by(
-            ('-' if is_descending else '') + 'site_name',
-            ('-' if is_descending else '') + 'location_name',
-            ('-' if is_descending else '') + 'device_name',
+        queryset = queryset.order_by(
+            ('-' if is_descending else '') + 'installed_site__name',
+            ('-' if is_descending else '') + 'installed_location__name',
+            ('-' if is_descending else '') + 'installed_device__name',
             ('-' if is_descending else '') + 'module__module_bay',
             ('-' if is_descending else '') + 'serial',
         )
         return (queryset, True)
 
     def order_installed_rack(self, queryset, is_descending):
-        queryset = self._order_annotate_installed(queryset).order_by(
-            ('-' if is_descending else '') + 'site_name',
-            ('-' if is_descending else '') + 'location_name',
-            ('-' if is_descending else '') + 'rack_name',
-            ('-' if is_descending else '') + 'device_name',
+        queryset = queryset.order_by(
+            ('-' if is_descending else '') + 'installed_site__name',
+            ('-' if is_descending else '') + 'installed_location__name',
+            ('-' if is_descending else '') + 'installed_rack__name',
+            ('-' if is_descending else '') + 'installed_device__name',
             ('-' if is_descending else '') + 'module__module_bay',
             ('-' if is_descending else '') + 'serial',
         )
         return (queryset, True)
 
     def order_installed_device(self, queryset, is_descending):
-        queryset = self._order_annotate_installed(queryset).order_by(
-            ('-' if is_descending else '') + 'device_name',
+        queryset = queryset.order_by(
+            ('-' if is_descending else '') + 'installed_device__name',
             ('-' if is_descending else '') + 'module__module_bay',
             ('-' if is_descending else '') + 'serial',
         )
@@ -756,46 +732,126 @@ class AuditTrailTable(NetBoxTable):
 # DCIM model table columns
 # ========================
 
-asset_count = columns.LinkedCountColumn(
+class AssetCountColumn(columns.LinkedCountColumn):
+    """
+    Number of assets related to each object in the table. Counts for all objects
+    shown in the table are loaded in one grouped query instead of one query per
+    row. Subclasses set group_field, the field of count_model that references
+    the counted object. If count_field is set, counts are read from it instead of
+    counting count_model objects.
+    """
+
+    count_model = Asset
+    group_field = None
+    count_field = None
+
+    def __init__(self, *args, **kwargs):
+        # render objects without assets as 0
+        kwargs.setdefault('empty_values', ())
+        kwargs.setdefault('accessor', 'pk')
+        super().__init__(*args, **kwargs)
+
+    def render(self, record, table, **kwargs):
+        return super().render(record, self._get_count(record, table))
+
+    def value(self, record, table, **kwargs):
+        return self._get_count(record, table)
+
+    def _get_count(self, record, table):
+        counts = getattr(table, '_asset_counts', None)
+        if counts is None:
+            page = getattr(table, 'page', None)
+            rows = page.object_list if page else table.data
+            counts = self.get_counts([getattr(row, 'record', row).pk for row in rows])
+            table._asset_counts = counts
+        return counts.get(record.pk, 0)
+
+    def order(self, queryset, is_descending):
+        queryset = queryset.annotate(
+            asset_count=Coalesce(Subquery(self.get_count_subquery()), 0),
+        ).order_by(('-' if is_descending else '') + 'asset_count')
+        return queryset, True
+
+    def get_counts(self, pks):
+        """
+        Return dict of asset counts for objects with pks.
+        """
+        queryset = self.count_model.objects.filter(
+            **{f'{self.group_field}__in': pks}
+        ).order_by()
+        if self.count_field:
+            return dict(queryset.values_list(self.group_field, self.count_field))
+        return dict(queryset.values_list(self.group_field).annotate(count=Count('pk')))
+
+    def get_count_subquery(self):
+        """
+        Return queryset with asset count of object referenced by OuterRef('pk').
+        """
+        queryset = self.count_model.objects.filter(
+            **{self.group_field: OuterRef('pk')}
+        ).order_by()
+        if self.count_field:
+            return queryset.values(self.count_field)
+        return (
+            queryset.values(self.group_field)
+            .annotate(count=Count('pk'))
+            .values('count')
+        )
+
+
+class DeviceTypeAssetCountColumn(AssetCountColumn):
+    group_field = 'device_type'
+
+
+class ModuleTypeAssetCountColumn(AssetCountColumn):
+    group_field = 'module_type'
+
+
+class RackTypeAssetCountColumn(AssetCountColumn):
+    group_field = 'rack_type'
+
+
+class LocationAssetCountColumn(AssetCountColumn):
+    """
+    Asset count of a Location and its children, read from LocationAssetCount.
+    """
+
+    count_model = LocationAssetCount
+    group_field = 'location'
+    count_field = 'count_with_children'
+
+
+asset_count = DeviceTypeAssetCountColumn(
     viewname='plugins:netbox_inventory:asset_list',
     url_params={'device_type_id': 'pk'},
     verbose_name=_('Asset Count'),
-    accessor='assets__count',
-    orderable=False,
 )
 
 register_table_column(asset_count, 'assets', DeviceTypeTable)
 
 
-asset_count = columns.LinkedCountColumn(
+asset_count = ModuleTypeAssetCountColumn(
     viewname='plugins:netbox_inventory:asset_list',
     url_params={'module_type_id': 'pk'},
-    verbose_name=_('AsseAsset Countts'),
-    accessor='assets__count',
-    orderable=False,
+    verbose_name=_('Asset Count'),
 )
 
 register_table_column(asset_count, 'assets', ModuleTypeTable)
 
 
-asset_count = columns.LinkedCountColumn(
+asset_count = RackTypeAssetCountColumn(
     viewname='plugins:netbox_inventory:asset_list',
     url_params={'rack_type_id': 'pk'},
     verbose_name=_('Asset Count'),
-    accessor='assets__count',
-    orderable=False,
 )
 
 register_table_column(asset_count, 'assets', RackTypeTable)
 
 
-asset_count = columns.LinkedCountColumn(
+asset_count = LocationAssetCountColumn(
     viewname='plugins:netbox_inventory:asset_list',
     url_params={'storage_location_id': 'pk'},
     verbose_name=_('Asset Count'),
-    # accessor='assets__count',
-    accessor=tables.A('assets__count_with_children'),
-    orderable=False,
 )
 
 register_table_column(asset_count, 'assets', LocationTable)
@@ -1,12 +1,13 @@
-from django.db.models import Model
+from django.db.models import Count, Exists, Model, OuterRef, Q
 from django.http import HttpRequest
 from django.template import Template
 
 from core.models import ObjectType
 from netbox.plugins import PluginTemplateExtension
+from utilities.query import dict_to_filter_params
 
 from .models import Asset, AuditFlow
-from .utils import query_located
+from .utils import cached_asset_stats, located_q, query_located
 
 #
 # Assets
@@ -78,12 +79,19 @@ class AssetLocationCounts(PluginTemplateExtension):
         object = self.context.get('object')
         user = self.context['request'].user
         assets_qs = Asset.objects.restrict(user, 'view')
-        count_installed = query_located(
-            assets_qs, self.location_type, [object.pk], assets_shown='installed'
-        ).count()
-        count_stored = query_located(
-            assets_qs, self.location_type, [object.pk], assets_shown='stored'
-        ).count()
+        q_installed = located_q(self.location_type, [object.pk], 'installed')
+        q_stored = located_q(self.location_type, [object.pk], 'stored')
+        counts = cached_asset_stats(
+            'located',
+            object,
+            assets_qs,
+            lambda: assets_qs.filter(q_installed | q_stored).aggregate(
+                installed=Count('pk', filter=q_installed),
+                stored=Count('pk', filter=q_stored),
+            ),
+        )
+        count_installed = counts['installed']
+        count_stored = counts['stored']
         context = {
             'asset_stats': [
                 {
@@ -134,21 +142,23 @@ class ManufacturerAssetCounts(PluginTemplateExtension):
     def right_page(self):
         object = self.context.get('object')
         user = self.context['request'].user
-        count_device = (
-            Asset.objects.restrict(user, 'view')
-            .filter(device_type__manufacturer=object)
-            .count()
-        )
-        count_module = (
-            Asset.objects.restrict(user, 'view')
-            .filter(module_type__manufacturer=object)
-            .count()
-        )
-        count_inventoryitem = (
-            Asset.objects.restrict(user, 'view')
-            .filter(inventoryitem_type__manufacturer=object)
-            .count()
+        assets_qs = Asset.objects.restrict(user, 'view')
+        q_device = Q(device_type__manufacturer=object)
+        q_module = Q(module_type__manufacturer=object)
+        q_inventoryitem = Q(inventoryitem_type__manufacturer=object)
+        counts = cached_asset_stats(
+            'manufacturer',
+            object,
+            assets_qs,
+            lambda: assets_qs.filter(q_device | q_module | q_inventoryitem).aggregate(
+                device=Count('pk', filter=q_device),
+                module=Count('pk', filter=q_module),
+                inventoryitem=Count('pk', filter=q_inventoryitem),
+            ),
         )
+        count_device = counts['device']
+        count_module = counts['module']
+        count_inventoryitem = counts['inventoryitem']
         context = {
             'asset_stats': [
                 {
@@ -199,13 +209,18 @@ class RackAssetCounts(PluginTemplateExtension):
         object = self.context.get('object')
         user = self.context['request'].user
         assets_qs = Asset.objects.restrict(user, 'view')
-        assets_qs = query_located(assets_qs, 'rack', [object.pk])
+        count = cached_asset_stats(
+            'located',
+            object,
+            assets_qs,
+            lambda: query_located(assets_qs, 'rack', [object.pk]).count(),
+        )
         context = {
             'asset_stats': [
                 {
                     'label': 'Installed',
                     'filter_field': 'installed_rack_id',
-                    'count': assets_qs.count(),
+                    'count': count,
                 },
             ],
         }
@@ -220,21 +235,29 @@ class TenantAssetCounts(PluginTemplateExtension):
     def right_page(self):
         object = self.context.get('object')
         user = self.context['request'].user
+        assets_qs = Asset.objects.restrict(user, 'view')
+        q_assigned = Q(tenant=object)
+        q_owned = Q(owning_tenant=object)
+        counts = cached_asset_stats(
+            'tenant',
+            object,
+            assets_qs,
+            lambda: assets_qs.filter(q_assigned | q_owned).aggregate(
+                assigned=Count('pk', filter=q_assigned),
+                owned=Count('pk', filter=q_owned),
+            ),
+        )
         context = {
             'asset_stats': [
                 {
                     'label': 'Assigned',
                     'filter_field': 'tenant_id',
-                    'count': Asset.objects.restrict(user, 'view')
-                    .filter(tenant=object)
-                    .count(),
+                    'count': counts['assigned'],
                 },
                 {
                     'label': 'Owned',
                     'filter_field': 'owning_tenant_id',
-                    'count': Asset.objects.restrict(user, 'view')
-                    .filter(owning_tenant=object)
-                    .count(),
+                    'count': counts['owned'],
                 },
             ],
         }
@@ -249,14 +272,19 @@ class ContactAssetCounts(PluginTemplateExtension):
     def right_page(self):
         object = self.context.get('object')
         user = self.context['request'].user
+        assets_qs = Asset.objects.restrict(user, 'view')
+        count = cached_asset_stats(
+            'contact',
+            object,
+            assets_qs,
+            lambda: assets_qs.filter(contact=object).count(),
+        )
         context = {
             'asset_stats': [
                 {
                     'label': 'Assigned',
                     'filter_field': 'contact_id',
-                    'count': Asset.objects.restrict(user, 'view')
-                    .filter(contact=object)
-                    .count(),
+                    'count': count,
                 },
             ],
         }
@@ -306,7 +334,32 @@ class AuditFlowRunButton(PluginTemplateExtension):
             .distinct()
         )
 
-        return [flow for flow in flows if flow.get_objects().filter(pk=obj.pk).exists()]
+        flows = list(flows)
+        if not flows:
+            return []
+
+        # Evaluate the object filters of all flows in a single query by annotating the
+        # object with one EXISTS subquery per flow.
+        model = obj._meta.model
+        applicable = (
+            model.objects.filter(pk=obj.pk)
+            .annotate(
+                **{
+                    f'flow_{flow.pk}': Exists(
+                        model.objects.filter(
+                            pk=OuterRef('pk'),
+                            **dict_to_filter_params(flow.object_filter or {}),
+                        )
+                    )
+                    for flow in flows
+                }
+            )
+            .values(*(f'flow_{flow.pk}' for flow in flows))
+            .first()
+        )
+        if not applicable:
+            return []
+        return [flow for flow in flows if applicable[f'flow_{flow.pk}']]
 
     def buttons(self):
         flows = self.get_flows()
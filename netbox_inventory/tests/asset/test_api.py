@@ -1,5 +1,8 @@
+import json
 from copy import copy
 
+from django.test import override_settings
+from django.urls import reverse
 from rest_framework import status
 
 from core.models import ObjectType
@@ -18,6 +21,7 @@ from utilities.testing import APIViewTestCases, disable_warnings
 
 from ...models import Asset, Delivery, InventoryItemType, Purchase, Supplier
 from ..custom import APITestCase
+from ..settings import CONFIG_GRAPHQL_MAX_DEPTH
 
 
 class AssetTest(
@@ -118,6 +122,81 @@ class AssetTest(
         instance = self._get_queryset().get(pk=response.data['id'])
         self.assertEqual(instance.purchase, self.purchase1)
 
+    def test_list_objects_cursor(self):
+        self.add_permissions('netbox_inventory.view_asset')
+        url = f'{self._get_list_url()}?cursor=&limit=2'
+        pks = []
+        while url:
+            response = self.client.get(url, **self.header)
+            self.assertHttpStatus(response, status.HTTP_200_OK)
+            self.assertIsNone(response.data['count'])
+            pks += [obj['id'] for obj in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(
+            pks, list(Asset.objects.order_by('pk').values_list('pk', flat=True))
+        )
+
+        response = self.client.get(
+            f'{self._get_list_url()}?cursor=&count=true', **self.header
+        )
+        self.assertEqual(response.data['count'], Asset.objects.count())
+
+    def test_export(self):
+        self.add_permissions('netbox_inventory.view_asset')
+        url = f'{self._get_list_url()}export/'
+
+        response = self.client.get(f'{url}?serial=asset1', **self.header)
+        self.assertHttpStatus(response, status.HTTP_200_OK)
+        rows = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).decode().splitlines()
+        ]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['serial'], 'asset1')
+        self.assertEqual(rows[0]['device_type']['display'], 'Device Type 1')
+
+        response = self.client.get(f'{url}?output=csv', **self.header)
+        self.assertHttpStatus(response, status.HTTP_200_OK)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertTrue(lines[0].startswith('id,name,asset_tag,serial'))
+        self.assertEqual(len(lines), Asset.objects.count() + 1)
+
+    def test_graphql_max_depth(self):
+        self.add_permissions(
+            'netbox_inventory.view_asset', 'dcim.view_devicetype'
+        )
+        query = '{ asset_list { id device_type { id } } }'
+
+        response = self.client.post(
+            reverse('graphql'), data={'query': query}, format='json', **self.header
+        )
+        self.assertHttpStatus(response, status.HTTP_200_OK)
+        self.assertNotIn('errors', response.data)
+        self.assertEqual(len(response.data['data']['asset_list']), 3)
+
+        with override_settings(PLUGINS_CONFIG=CONFIG_GRAPHQL_MAX_DEPTH):
+            response = self.client.post(
+                reverse('graphql'), data={'query': query}, format='json', **self.header
+            )
+        self.assertIn('errors', response.data)
+
+    def test_graphql_asset_counts(self):
+        self.add_permissions('netbox_inventory.view_asset')
+        query = '{ asset_counts(group_by: [kind, warranty]) { kind warranty count } }'
+
+        response = self.client.post(
+            reverse('graphql'), data={'query': query}, format='json', **self.header
+        )
+        self.assertHttpStatus(response, status.HTTP_200_OK)
+        self.assertNotIn('errors', response.data)
+        self.assertEqual(
+            response.data['data']['asset_counts'],
+            [
+                {'kind': 'device', 'warranty': 'unknown', 'count': 2},
+                {'kind': 'rack', 'warranty': 'unknown', 'count': 1},
+            ],
+        )
+
     def test_serial_asset_tag_empty(self):
         """
         check that assigning empty string for serial or asset_tag, normalizes to None
@@ -0,0 +1,87 @@
+import uuid
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase
+
+from core.models import Job
+from dcim.models import DeviceType, Manufacturer
+from users.models import User
+
+from netbox_inventory.constants import (
+    ASSET_IMPORT_JOB_NAME,
+    ASSET_IMPORT_STORAGE_PATH,
+)
+from netbox_inventory.jobs import AssetImportJob
+from netbox_inventory.models import Asset
+
+
+class AssetImportJobTestCase(TestCase):
+    csv_data = '\n'.join(
+        (
+            'serial,status,hardware_kind,manufacturer,model_name',
+            'job1,stored,device,manufacturer1,device_type1',
+            'job2,stored,device,manufacturer1,missing_type',
+            'job3,stored,device,manufacturer1,device_type1',
+        )
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        manufacturer1 = Manufacturer.objects.create(
+            name='manufacturer1',
+            slug='manufacturer1',
+        )
+        DeviceType.objects.create(
+            manufacturer=manufacturer1, model='device_type1', slug='device_type1'
+        )
+        cls.user = User.objects.create_user(username='importer', is_superuser=True)
+
+    def _run_job(self, data=None, **kwargs):
+        job = Job.objects.create(
+            name=ASSET_IMPORT_JOB_NAME,
+            user=self.user,
+            job_id=uuid.uuid4(),
+        )
+        self.data_file = default_storage.save(
+            f'{ASSET_IMPORT_STORAGE_PATH}test.csv',
+            ContentFile((data or self.csv_data).encode()),
+        )
+        AssetImportJob(job).run(data_file=self.data_file, **kwargs)
+        return job
+
+    def test_import_chunks_and_errors(self):
+        job = self._run_job(chunk_size=2)
+
+        self.assertEqual(
+            sorted(Asset.objects.values_list('serial', flat=True)), ['job1', 'job3']
+        )
+        self.assertEqual(job.data['committed_rows'], 3)
+        self.assertEqual(job.data['created'], 2)
+        self.assertEqual(job.data['error_count'], 1)
+        self.assertEqual(job.data['errors'][0]['row'], 2)
+        self.assertIn('model_name', job.data['errors'][0]['errors'])
+        self.assertFalse(default_storage.exists(self.data_file))
+
+    def test_import_resume(self):
+        first_job = self._run_job(chunk_size=1)
+        first_job.data['committed_rows'] = 1
+        first_job.save()
+        Asset.objects.exclude(serial='job1').delete()
+
+        job = self._run_job(resume_job_id=first_job.pk)
+
+        self.assertEqual(job.data['resumed_from'], 1)
+        self.assertEqual(job.data['created'], 1)
+        self.assertEqual(
+            sorted(Asset.objects.values_list('serial', flat=True)), ['job1', 'job3']
+        )
+
+    def test_import_resume_other_data(self):
+        first_job = self._run_job(chunk_size=1)
+
+        with self.assertRaises(ValueError):
+            self._run_job(
+                data=self.csv_data.replace('job3', 'job4'),
+                resume_job_id=first_job.pk,
+            )
@@ -1,11 +1,48 @@
 from django.forms import ValidationError
 from django.test import TestCase, override_settings
 
-from dcim.models import Device, DeviceRole, DeviceType, Manufacturer, Site
+from core.models import ObjectChange, ObjectType
+from dcim.models import (
+    Device,
+    DeviceRole,
+    DeviceType,
+    Location,
+    Manufacturer,
+    ModuleType,
+    Rack,
+    RackType,
+    Site,
+)
 from utilities.exceptions import AbortRequest
 
-from ..settings import CONFIG_SYNC_OFF, CONFIG_SYNC_ON
-from netbox_inventory.models import Asset, Delivery, Purchase, Supplier
+from ..settings import (
+    CONFIG_ASSET_SEARCH_DOCUMENT,
+    CONFIG_ASSET_STATS_CACHE,
+    CONFIG_CUSTOM_FIELD_SEARCH,
+    CONFIG_SYNC_OFF,
+    CONFIG_SYNC_ON,
+)
+from netbox_inventory.filtersets import AssetFilterSet
+from netbox_inventory.indexes import get_custom_field_indexes
+from netbox_inventory.models import (
+    Asset,
+    Delivery,
+    LocationAssetCount,
+    Purchase,
+    Supplier,
+)
+from netbox_inventory.reconcile import apply_hardware_fixes, get_hardware_mismatches
+from netbox_inventory.utils import (
+    cached_asset_stats,
+    cached_get,
+    cached_get_or_create,
+    get_prechange_field,
+    import_lookup_cache,
+    prechange_batch,
+    serial_asset_tag_guard_suppressed,
+    suppress_serial_asset_tag_guard,
+    validate_serial_asset_tag_batch,
+)
 
 
 class TestAssetModel(TestCase):
@@ -86,6 +123,13 @@ class TestAssetModel(TestCase):
         with self.assertRaises(AbortRequest):
             self.device1.save()
 
+        # unless guard is suppressed in current context
+        with suppress_serial_asset_tag_guard():
+            self.device1.save()
+        self.device1.refresh_from_db()
+        self.assertEqual(self.device1.serial, 'notallowed')
+        self.assertFalse(serial_asset_tag_guard_suppressed())
+
         # assign defferent device
         self.assertEqual(self.asset1.device, self.device1)
         self.asset1.snapshot()
@@ -111,6 +155,29 @@ class TestAssetModel(TestCase):
         self.assertEqual(self.device2.serial, '')
         self.assertEqual(self.device2.asset_tag, None)
 
+    @override_settings(PLUGINS_CONFIG=CONFIG_SYNC_ON)
+    def test_validate_serial_asset_tag_batch(self):
+        self.asset1.snapshot()
+        self.asset1.device = self.device1
+        self.asset1.save()
+        devices = list(Device.objects.filter(pk__in=(self.device1.pk, self.device2.pk)))
+        for device in devices:
+            device.snapshot()
+            device.name += '-renamed'
+
+        # assigned assets of whole batch are looked up in one query
+        with self.assertNumQueries(1):
+            validate_serial_asset_tag_batch(devices)
+        with suppress_serial_asset_tag_guard():
+            for device in devices:
+                device.save()
+
+        devices[0].serial = 'notallowed'
+        with self.assertRaises(AbortRequest):
+            validate_serial_asset_tag_batch(devices)
+        with self.assertRaises(AbortRequest):
+            devices[0].save()
+
     @override_settings(PLUGINS_CONFIG=CONFIG_SYNC_OFF)
     def test_update_hardware_used_off(self):
         # assign device to asset
@@ -180,10 +247,276 @@ class TestAssetModel(TestCase):
         self.asset1.full_clean()
         self.asset1.save()
         self.assertEqual(self.asset1.status, 'used')
-        self.device1.delete()
+        # asset is released when deleting transaction commits
+        with self.captureOnCommitCallbacks(execute=True):
+            self.device1.delete()
         self.asset1.refresh_from_db()
         self.assertEqual(self.asset1.status, 'stored')
 
+    def test_status_devices_bulk_deleted(self):
+        asset2 = Asset.objects.create(
+            asset_tag='asset2',
+            serial='asset2',
+            status='used',
+            device_type=self.device_type1,
+            device=self.device2,
+        )
+        self.asset1.snapshot()
+        self.asset1.device = self.device1
+        self.asset1.save()
+
+        # NetBox bulk delete views delete objects one by one
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            for device in Device.objects.filter(
+                pk__in=(self.device1.pk, self.device2.pk)
+            ):
+                device.delete()
+        self.assertEqual(len(callbacks), 1)
+        for asset in (self.asset1, asset2):
+            asset.refresh_from_db()
+            self.assertEqual(asset.status, 'stored')
+            self.assertIsNone(asset.device)
+            self.assertIsNone(asset.installed_site)
+        self.assertEqual(
+            ObjectChange.objects.filter(
+                changed_object_type=ObjectType.objects.get_for_model(Asset),
+                action='update',
+                postchange_data__status='stored',
+            ).count(),
+            2,
+        )
+
+    def test_kind(self):
+        self.assertEqual(self.asset1.kind, 'device')
+        self.assertEqual(self.asset1.get_kind_display(), 'Device')
+        self.assertEqual(Asset.objects.filter(kind='device').count(), 1)
+        self.assertEqual(Asset.objects.filter(kind='module').count(), 0)
+
+    def test_kind_multiple_types(self):
+        module_type1 = ModuleType.objects.create(
+            manufacturer=self.manufacturer1, model='module_type1'
+        )
+        self.asset1.snapshot()
+        self.asset1.module_type = module_type1
+        with self.assertRaises(ValidationError):
+            self.asset1.full_clean()
+
+    def test_prechange_field_cached(self):
+        self.asset1.device = self.device1
+        self.asset1.save()
+        self.asset1.snapshot()
+        with self.assertNumQueries(1):
+            self.assertEqual(get_prechange_field(self.asset1, 'device'), self.device1)
+            self.assertEqual(get_prechange_field(self.asset1, 'device'), self.device1)
+        # new snapshot invalidates cached objects
+        self.asset1.snapshot()
+        with self.assertNumQueries(1):
+            get_prechange_field(self.asset1, 'device')
+
+    def test_prechange_batch(self):
+        self.asset1.device = self.device1
+        self.asset1.save()
+        queryset = Asset.objects.filter(pk=self.asset1.pk)
+        with prechange_batch(queryset, ['device', 'module']):
+            asset = queryset.get()
+            asset.snapshot()
+            with self.assertNumQueries(0):
+                self.assertEqual(get_prechange_field(asset, 'device'), self.device1)
+
+    def test_import_lookup_cache(self):
+        with import_lookup_cache():
+            cached_get(Manufacturer, name='manufacturer1')
+            cached_get_or_create(Manufacturer, name__iexact='manufacturer1')
+            with self.assertNumQueries(0):
+                self.assertEqual(
+                    cached_get(Manufacturer, name='manufacturer1'),
+                    self.manufacturer1,
+                )
+                manufacturer, _ = cached_get_or_create(
+                    Manufacturer, name__iexact='MANUFACTURER1'
+                )
+                self.assertEqual(manufacturer, self.manufacturer1)
+        # outside of import, every lookup hits the database
+        with self.assertNumQueries(1):
+            cached_get(Manufacturer, name='manufacturer1')
+
+    @override_settings(PLUGINS_CONFIG=CONFIG_ASSET_STATS_CACHE)
+    def test_asset_stats_cache(self):
+        assets_qs = Asset.objects.all()
+
+        def count():
+            return cached_asset_stats(
+                'test', self.site1, assets_qs, lambda: assets_qs.count()
+            )
+
+        self.assertEqual(count(), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(count(), 1)
+        # any asset change invalidates cached values once committed
+        with self.captureOnCommitCallbacks(execute=True):
+            Asset.objects.create(status='stored', device_type=self.device_type1)
+        self.assertEqual(count(), 2)
+
+    def test_location_asset_count(self):
+        def counts(location):
+            row = LocationAssetCount.objects.filter(location=location).first()
+            return (row.count, row.count_with_children) if row else (0, 0)
+
+        parent = Location.objects.create(name='parent', slug='parent', site=self.site1)
+        child = Location.objects.create(
+            name='child', slug='child', site=self.site1, parent=parent
+        )
+        other = Location.objects.create(name='other', slug='other', site=self.site1)
+
+        self.asset1.storage_location = child
+        self.asset1.save()
+        Asset.objects.create(
+            status='stored', device_type=self.device_type1, storage_location=parent
+        )
+        self.assertEqual(counts(parent), (1, 2))
+        self.assertEqual(counts(child), (1, 1))
+        self.assertEqual(parent.assets.count_with_children(), 2)
+
+        # moving asset to another location, stored location taken from snapshot
+        self.asset1.snapshot()
+        self.asset1.storage_location = other
+        self.asset1.save()
+        self.assertEqual(counts(parent), (1, 1))
+        self.assertEqual(counts(child), (0, 0))
+        self.assertEqual(counts(other), (1, 1))
+
+        # moving location in tree
+        other.snapshot()
+        other.parent = parent
+        other.save()
+        self.assertEqual(counts(parent), (1, 2))
+
+        self.asset1.delete()
+        self.assertEqual(counts(parent), (1, 1))
+        self.assertEqual(counts(other), (0, 0))
+
+        # rebuild gives the same result
+        LocationAssetCount.objects.all().delete()
+        LocationAssetCount.objects.refresh()
+        self.assertEqual(counts(parent), (1, 1))
+        self.assertEqual(counts(other), (0, 0))
+
+    @override_settings(PLUGINS_CONFIG=CONFIG_ASSET_SEARCH_DOCUMENT)
+    def test_search_document(self):
+        def search(value):
+            return list(AssetFilterSet({'q': value}, Asset.objects.all()).qs)
+
+        self.asset1.snapshot()
+        self.asset1.purchase = self.purchase1
+        self.asset1.save()
+        self.asset1.refresh_from_db()
+        self.assertIn('purchase1', self.asset1.search_document)
+        self.assertEqual(search('ASSET1'), [self.asset1])
+        self.assertEqual(search('purchase1'), [self.asset1])
+
+        # renaming related object updates search document
+        self.purchase1.snapshot()
+        self.purchase1.name = 'Renamed purchase'
+        self.purchase1.save()
+        self.assertEqual(search('purchase1'), [])
+        self.assertEqual(search('renamed'), [self.asset1])
+
+        # so does changing supplier of purchase
+        supplier2 = Supplier.objects.create(name='Supplier2', slug='supplier2')
+        self.purchase1.snapshot()
+        self.purchase1.supplier = supplier2
+        self.purchase1.save()
+        self.assertEqual(search('supplier2'), [self.asset1])
+
+    @override_settings(PLUGINS_CONFIG=CONFIG_CUSTOM_FIELD_SEARCH)
+    def test_custom_field_indexes(self):
+        indexes, unsupported = get_custom_field_indexes()
+        # iexact and istartswith share an index on upper(value)
+        self.assertEqual(
+            sorted(filters for _, filters in indexes.values()),
+            [
+                ['custom_field_data__asset_mac__icontains'],
+                [
+                    'custom_field_data__asset_mac__iexact',
+                    'custom_field_data__asset_mac__istartswith',
+                ],
+            ],
+        )
+        self.assertEqual(unsupported, ['custom_field_data__asset_mac__regex'])
+
+    @override_settings(PLUGINS_CONFIG=CONFIG_SYNC_ON)
+    def test_reconcile_hardware(self):
+        self.asset1.snapshot()
+        self.asset1.device = self.device1
+        self.asset1.save()
+        self.assertEqual(list(get_hardware_mismatches('device')), [])
+
+        # bulk update bypasses signals and leaves device out of sync
+        Device.objects.filter(pk=self.device1.pk).update(serial='drift')
+        rows = list(get_hardware_mismatches('device'))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['current_serial'], 'drift')
+        self.assertEqual(rows[0]['expected_serial'], self.asset1.serial)
+        self.assertEqual(rows[0]['current_asset_tag'], rows[0]['expected_asset_tag'])
+
+        self.assertEqual(apply_hardware_fixes('device', rows), 1)
+        self.device1.refresh_from_db()
+        self.assertEqual(self.device1.serial, self.asset1.serial)
+        self.assertEqual(list(get_hardware_mismatches('device')), [])
+
+    @override_settings(PLUGINS_CONFIG=CONFIG_SYNC_ON)
+    def test_reconcile_rack_without_type(self):
+        rack_type1 = RackType.objects.create(
+            manufacturer=self.manufacturer1, model='rack_type1', slug='rack_type1'
+        )
+        rack1 = Rack.objects.create(site=self.site1, status='active', name='rack1')
+        Asset.objects.create(
+            asset_tag='rack_asset',
+            status='stored',
+            rack_type=rack_type1,
+            rack=rack1,
+        )
+        # rack type removed with bulk update that bypasses signals
+        Rack.objects.filter(pk=rack1.pk).update(rack_type=None)
+
+        rows = list(get_hardware_mismatches('rack'))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['current_rack_type_id'], 0)
+        self.assertEqual(rows[0]['expected_rack_type_id'], rack_type1.pk)
+
+        apply_hardware_fixes('rack', rows)
+        rack1.refresh_from_db()
+        self.assertEqual(rack1.rack_type, rack_type1)
+
+    def test_installed_fields(self):
+        self.asset1.snapshot()
+        self.asset1.device = self.device1
+        self.asset1.full_clean()
+        self.asset1.save()
+        self.asset1.refresh_from_db()
+        self.assertEqual(self.asset1.installed_device, self.device1)
+        self.assertEqual(self.asset1.installed_site, self.site1)
+        self.assertIsNone(self.asset1.installed_location)
+        self.assertIsNone(self.asset1.installed_rack)
+
+        # moving device to another site updates asset
+        site2 = Site.objects.create(name='site2', slug='site2', status='active')
+        self.device1.snapshot()
+        self.device1.site = site2
+        self.device1.full_clean()
+        self.device1.save()
+        self.asset1.refresh_from_db()
+        self.assertEqual(self.asset1.installed_site, site2)
+
+        # unassigning clears installed fields
+        self.asset1.snapshot()
+        self.asset1.device = None
+        self.asset1.full_clean()
+        self.asset1.save()
+        self.asset1.refresh_from_db()
+        self.assertIsNone(self.asset1.installed_device)
+        self.assertIsNone(self.asset1.installed_site)
+
     def test_purchase_delivery_missmatch(self):
         self.asset1.snapshot()
         self.asset1.purchase = self.purchase2
@@ -212,3 +545,20 @@ class TestAssetModel(TestCase):
         self.delivery1.save()
         self.asset1.refresh_from_db()
         self.assertEqual(self.asset1.purchase, self.purchase2)
+        self.assertTrue(
+            ObjectChange.objects.filter(
+                changed_object_type=ObjectType.objects.get_for_model(Asset),
+                changed_object_id=self.asset1.pk,
+                postchange_data__purchase=self.purchase2.pk,
+            ).exists()
+        )
+
+        # other changes of delivery don't touch assets
+        asset_changes = ObjectChange.objects.filter(
+            changed_object_type=ObjectType.objects.get_for_model(Asset),
+        )
+        count = asset_changes.count()
+        self.delivery1.snapshot()
+        self.delivery1.description = 'changed'
+        self.delivery1.save()
+        self.assertEqual(asset_changes.count(), count)
@@ -0,0 +1,62 @@
+from django.test import TestCase
+
+from dcim.models import DeviceType, Location, Manufacturer, Site
+from dcim.tables import DeviceTypeTable, LocationTable
+
+from netbox_inventory.models import Asset
+from netbox_inventory.tables import DeviceTypeAssetCountColumn, LocationAssetCountColumn
+
+
+class TestAssetCountColumn(TestCase):
+    def setUp(self):
+        self.site1 = Site.objects.create(
+            name='site1',
+            slug='site1',
+            status='active',
+        )
+        self.manufacturer1 = Manufacturer.objects.create(
+            name='manufacturer1',
+            slug='manufacturer1',
+        )
+        self.device_type1 = DeviceType.objects.create(
+            manufacturer=self.manufacturer1, model='device_type1', slug='device_type1'
+        )
+        self.location1 = Location.objects.create(
+            name='location1', slug='location1', site=self.site1
+        )
+        self.asset1 = Asset.objects.create(
+            asset_tag='asset1',
+            serial='asset1',
+            status='stored',
+            device_type=self.device_type1,
+            storage_location=self.location1,
+        )
+
+    def test_hardware_type_asset_count_column(self):
+        device_type2 = DeviceType.objects.create(
+            manufacturer=self.manufacturer1, model='device_type2', slug='device_type2'
+        )
+        table = DeviceTypeTable(DeviceType.objects.all())
+        column = table.columns['assets'].column
+        self.assertIsInstance(column, DeviceTypeAssetCountColumn)
+        # counts for all rows are loaded with one query
+        with self.assertNumQueries(1):
+            self.assertEqual(column.value(record=self.device_type1, table=table), 1)
+            self.assertEqual(column.value(record=device_type2, table=table), 0)
+
+        queryset, _ = column.order(DeviceType.objects.all(), is_descending=True)
+        self.assertEqual(queryset.first(), self.device_type1)
+
+    def test_location_asset_count_column(self):
+        location2 = Location.objects.create(
+            name='location2', slug='location2', site=self.site1
+        )
+        table = LocationTable(Location.objects.all())
+        column = table.columns['assets'].column
+        self.assertIsInstance(column, LocationAssetCountColumn)
+        with self.assertNumQueries(1):
+            self.assertEqual(column.value(record=self.location1, table=table), 1)
+            self.assertEqual(column.value(record=location2, table=table), 0)
+
+        queryset, _ = column.order(Location.objects.all(), is_descending=True)
+        self.assertEqual(queryset.first(), self.location1)
@@ -1,6 +1,7 @@
 from django.test import override_settings
 
-from core.models import ObjectType
+from core.choices import ObjectChangeActionChoices
+from core.models import ObjectChange, ObjectType
 from dcim.models import Device, DeviceRole, DeviceType, Manufacturer, Site
 from users.models import ObjectPermission
 from utilities.testing import ViewTestCases, post_data
@@ -247,3 +248,54 @@ class AssetBulkAddTestCase(
             list(Asset.objects.order_by('asset_tag').values_list('asset_tag', flat=True)),
             ['ASSET-1', 'ASSET-2', 'ASSET-3'],
         )
+
+    def test_bulk_create_objects_changelog(self):
+        obj_perm = ObjectPermission(name='test-asset-bulk-add-changelog', actions=['add'])
+        obj_perm.save()
+        obj_perm.users.add(self.user)
+        obj_perm.object_types.add(ObjectType.objects.get_for_model(self.model))
+
+        form_data = {
+            'count': 3,
+            'status': 'stored',
+            'device_type': DeviceType.objects.first().pk,
+        }
+        request = {
+            'path': self._get_url('add'),
+            'data': post_data(form_data),
+        }
+        self.assertHttpStatus(self.client.post(**request), 302)
+
+        assets = Asset.objects.all()
+        self.assertEqual(assets.count(), 3)
+        self.assertEqual(set(assets.values_list('kind', flat=True)), {'device'})
+        self.assertEqual(
+            ObjectChange.objects.filter(
+                changed_object_type=ObjectType.objects.get_for_model(Asset),
+                changed_object_id__in=assets.values('pk'),
+                action=ObjectChangeActionChoices.ACTION_CREATE,
+                user=self.user,
+            ).count(),
+            3,
+        )
+
+    def test_bulk_create_objects_with_existing_asset_tag(self):
+        obj_perm = ObjectPermission(name='test-asset-bulk-add-existing', actions=['add'])
+        obj_perm.save()
+        obj_perm.users.add(self.user)
+        obj_perm.object_types.add(ObjectType.objects.get_for_model(self.model))
+        device_type = DeviceType.objects.first()
+        Asset.objects.create(asset_tag='ASSET-2', status='stored', device_type=device_type)
+
+        form_data = {
+            'count': 3,
+            'pattern': 'ASSET-[1-3]',
+            'status': 'stored',
+            'device_type': device_type.pk,
+        }
+        request = {
+            'path': self._get_url('add'),
+            'data': post_data(form_data),
+        }
+        self.assertHttpStatus(self.client.post(**request), 200)
+        self.assertEqual(Asset.objects.count(), 1)
@@ -1,6 +1,9 @@
+from django.urls import reverse
+from rest_framework import status
+
 from utilities.testing import APIViewTestCases
 
-from ...models import AssetRole
+from ...models import Asset, AssetRole
 from ..custom import APITestCase
 
 
@@ -37,3 +40,34 @@ class AssetRoleTest(
         AssetRole.objects.create(name='Asset Role 1', slug='asset-role-1')
         AssetRole.objects.create(name='Asset Role 2', slug='asset-role-2')
         AssetRole.objects.create(name='Asset Role 3', slug='asset-role-3')
+
+    def test_status_counts(self):
+        parent = AssetRole.objects.get(slug='asset-role-1')
+        child = AssetRole.objects.create(
+            name='Asset Role 7', slug='asset-role-7', parent=parent
+        )
+        grandchild = AssetRole.objects.create(
+            name='Asset Role 8', slug='asset-role-8', parent=child
+        )
+        Asset.objects.create(name='asset1', status='stored', role=parent)
+        Asset.objects.create(name='asset2', status='stored', role=grandchild)
+        Asset.objects.create(name='asset3', status='used', role=grandchild)
+        self.add_permissions(
+            'netbox_inventory.view_assetrole', 'netbox_inventory.view_asset'
+        )
+
+        url = reverse(
+            'plugins-api:netbox_inventory-api:assetrole-status-counts',
+            kwargs={'pk': parent.pk},
+        )
+        response = self.client.get(url, **self.header)
+        self.assertHttpStatus(response, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 3)
+        status_counts = {
+            sc['value']: sc['count'] for sc in response.data['status_counts']
+        }
+        self.assertEqual(status_counts['stored'], 2)
+        self.assertEqual(status_counts['used'], 1)
+        self.assertEqual(len(response.data['children']), 1)
+        self.assertEqual(response.data['children'][0]['id'], child.pk)
+        self.assertEqual(response.data['children'][0]['count'], 2)
@@ -1,8 +1,10 @@
 from django.contrib import messages
 from django.contrib.messages.test import MessagesTestMixin
+from django.db import connection
 from django.db.models import Model
 from django.http import HttpResponse
-from django.test import override_settings
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from core.models import ObjectType
@@ -15,8 +17,10 @@ from netbox_inventory.models import (
     AuditFlow,
     AuditFlowPage,
     AuditFlowPageAssignment,
+    AuditLastSeen,
     AuditTrail,
 )
+from netbox_inventory.template_content import AuditFlowRunButton
 from netbox_inventory.tests.custom import ModelViewTestCase
 
 
@@ -174,6 +178,31 @@ class AuditFlowRunTest(AuditFlowTestDataMixin, MessagesTestMixin, TestCase):
             str(response.content),
         )
 
+    def test_run_button_query_count(self) -> None:
+        site = Site.objects.order_by('name').first()
+        request = RequestFactory().get(site.get_absolute_url())
+        request.user = self.user
+
+        def count_queries():
+            button = AuditFlowRunButton({'object': site, 'request': request})
+            with CaptureQueriesContext(connection) as queries:
+                flows = button.get_flows()
+            return len(flows), len(queries)
+
+        # warm up user permission cache
+        count_queries()
+        flow_count, query_count = count_queries()
+
+        # Assign pages to the remaining flows, one with a non-matching filter.
+        page = AuditFlowPage.objects.first()
+        flows = list(AuditFlow.objects.exclude(pages=page).order_by('name'))
+        flows[0].object_filter = {'name': 'not site 1'}
+        flows[0].save()
+        for flow in flows:
+            AuditFlowPageAssignment.objects.create(flow=flow, page=page)
+
+        self.assertEqual(count_queries(), (flow_count + len(flows) - 1, query_count))
+
     def test_add_object_button_hidden_if_no_permission(self) -> None:
         response = self._run_audit_flow(AuditFlow.objects.first(), Site.objects.first())
 
@@ -312,6 +341,7 @@ class AuditFlowRunTest(AuditFlowTestDataMixin, MessagesTestMixin, TestCase):
             AuditTrail(object=assets[1]),
         )
         AuditTrail.objects.bulk_create(audit_trails)
+        AuditLastSeen.objects.refresh_for(audit_trails)
 
         audit_flow = AuditFlow.objects.first()
 
@@ -0,0 +1,77 @@
+from django.test import TestCase
+
+from core.models import ObjectType
+from dcim.models import DeviceType, Manufacturer
+
+from netbox_inventory.models import (
+    Asset,
+    AuditLastSeen,
+    AuditTrail,
+    AuditTrailSource,
+)
+
+
+class AuditLastSeenTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        manufacturer = Manufacturer.objects.create(
+            name='manufacturer 1',
+            slug='manufacturer-1',
+        )
+        device_type = DeviceType.objects.create(
+            manufacturer=manufacturer,
+            model='DeviceType 1',
+            slug='devicetype-1',
+        )
+        cls.asset1 = Asset.objects.create(
+            serial='asset1',
+            status='stored',
+            device_type=device_type,
+        )
+        cls.asset2 = Asset.objects.create(
+            serial='asset2',
+            status='stored',
+            device_type=device_type,
+        )
+        cls.source = AuditTrailSource.objects.create(
+            name='Source 1',
+            slug='source-1',
+        )
+
+    def _get_last_seen(self, obj):
+        return AuditLastSeen.objects.filter(
+            object_type=ObjectType.objects.get_for_model(obj),
+            object_id=obj.pk,
+        ).first()
+
+    def test_create_and_delete(self):
+        first = AuditTrail.objects.create(object=self.asset1)
+        second = AuditTrail.objects.create(object=self.asset1, source=self.source)
+
+        last_seen = self._get_last_seen(self.asset1)
+        self.assertEqual(last_seen.audit_trail, second)
+        self.assertEqual(last_seen.created, second.created)
+        self.assertEqual(last_seen.source, self.source)
+        self.assertEqual(last_seen.count, 2)
+        self.assertIsNone(self._get_last_seen(self.asset2))
+
+        second.delete()
+        last_seen = self._get_last_seen(self.asset1)
+        self.assertEqual(last_seen.audit_trail, first)
+        self.assertIsNone(last_seen.source)
+        self.assertEqual(last_seen.count, 1)
+
+        first.delete()
+        self.assertIsNone(self._get_last_seen(self.asset1))
+
+    def test_bulk_create_logged(self):
+        AuditTrail.objects.bulk_create_logged(
+            [
+                AuditTrail(object=self.asset1),
+                AuditTrail(object=self.asset1),
+                AuditTrail(object=self.asset2),
+            ]
+        )
+
+        self.assertEqual(self._get_last_seen(self.asset1).count, 2)
+        self.assertEqual(self._get_last_seen(self.asset2).count, 1)
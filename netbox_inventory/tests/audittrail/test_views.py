@@ -1,12 +1,18 @@
 from django.test import override_settings
 from django.urls import reverse
 
-from core.models import ObjectType
+from core.choices import ObjectChangeActionChoices
+from core.models import ObjectChange, ObjectType
 from dcim.models import DeviceType, Manufacturer
 from users.models import ObjectPermission
 from utilities.testing import ViewTestCases, post_data
 
-from netbox_inventory.models import Asset, AuditTrail, AuditTrailSource
+from netbox_inventory.models import (
+    Asset,
+    AuditLastSeen,
+    AuditTrail,
+    AuditTrailSource,
+)
 from netbox_inventory.tests.custom import ModelViewTestCase
 
 
@@ -59,6 +65,7 @@ class AuditTrailViewTestCase(
             AuditTrail(object=assets[2]),
         )
         AuditTrail.objects.bulk_create(audit_trails)
+        AuditLastSeen.objects.refresh_for(audit_trails)
 
         audit_trail_source = AuditTrailSource.objects.create(
             name='Source 1',
@@ -133,6 +140,18 @@ class AuditTrailViewTestCase(
             ),
         )
 
+        # auditor is recorded in change log of each new audit trail
+        for audit_trail in AuditTrail.objects.filter(object_changes__isnull=False):
+            self.assertEqual(audit_trail.object_changes.first().user, self.user)
+        self.assertEqual(
+            ObjectChange.objects.filter(
+                changed_object_type=ObjectType.objects.get_for_model(AuditTrail),
+                action=ObjectChangeActionChoices.ACTION_CREATE,
+                user_name=self.user.username,
+            ).count(),
+            len(data['pk']),
+        )
+
     @override_settings(EXEMPT_VIEW_PERMISSIONS=['*'])
     def test_view_object_with_audit_trails(self) -> None:
         asset = Asset.objects.first()
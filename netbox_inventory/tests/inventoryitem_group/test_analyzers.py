@@ -0,0 +1,61 @@
+from django.test import TestCase
+
+from dcim.models import Manufacturer
+
+from netbox_inventory.analyzers import asset_counts_status, asset_counts_type_status
+from netbox_inventory.choices import AssetStatusChoices
+from netbox_inventory.models import Asset, InventoryItemGroup, InventoryItemType
+
+
+class TestAssetCounts(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        manufacturer = Manufacturer.objects.create(
+            name='manufacturer1', slug='manufacturer1'
+        )
+        cls.group = InventoryItemGroup.objects.create(name='group')
+        child_group = InventoryItemGroup.objects.create(
+            name='child_group', parent=cls.group
+        )
+        cls.type_a = InventoryItemType.objects.create(
+            manufacturer=manufacturer,
+            model='a',
+            slug='a',
+            inventoryitem_group=cls.group,
+        )
+        cls.type_b = InventoryItemType.objects.create(
+            manufacturer=manufacturer,
+            model='b',
+            slug='b',
+            inventoryitem_group=child_group,
+        )
+        # child group types without assets are not shown
+        InventoryItemType.objects.create(
+            manufacturer=manufacturer,
+            model='c',
+            slug='c',
+            inventoryitem_group=child_group,
+        )
+        for status in ('stored', 'stored', 'used'):
+            Asset.objects.create(inventoryitem_type=cls.type_b, status=status)
+
+    def test_asset_counts_type_status(self):
+        with self.assertNumQueries(1):
+            counts = asset_counts_type_status(self.group)
+        self.assertEqual(
+            [c['inventoryitem_type'] for c in counts],
+            [self.type_a.pk, self.type_b.pk],
+        )
+        statuses = [s for s, _ in AssetStatusChoices]
+        for type_counts in counts:
+            self.assertEqual(
+                [s['status'] for s in type_counts['status_list']], statuses
+            )
+        type_b_counts = {s['status']: s['count'] for s in counts[1]['status_list']}
+        self.assertEqual(type_b_counts['stored'], 2)
+        self.assertEqual(type_b_counts['used'], 1)
+        self.assertEqual(sum(s['count'] for s in counts[0]['status_list']), 0)
+
+        status_counts = asset_counts_status(counts)
+        self.assertEqual(status_counts['stored']['count'], 2)
+        self.assertEqual(status_counts['used']['count'], 1)
@@ -15,3 +15,17 @@ CONFIG_SYNC_ON['netbox_inventory']['sync_hardware_serial_asset_tag'] = True
 
 CONFIG_SYNC_OFF = deepcopy(settings.PLUGINS_CONFIG)
 CONFIG_SYNC_OFF['netbox_inventory']['sync_hardware_serial_asset_tag'] = False
+
+CONFIG_ASSET_STATS_CACHE = deepcopy(settings.PLUGINS_CONFIG)
+CONFIG_ASSET_STATS_CACHE['netbox_inventory']['asset_stats_cache_timeout'] = 60
+
+CONFIG_ASSET_SEARCH_DOCUMENT = deepcopy(settings.PLUGINS_CONFIG)
+CONFIG_ASSET_SEARCH_DOCUMENT['netbox_inventory']['asset_search_document'] = True
+
+CONFIG_CUSTOM_FIELD_SEARCH = deepcopy(settings.PLUGINS_CONFIG)
+CONFIG_CUSTOM_FIELD_SEARCH['netbox_inventory']['asset_custom_fields_search_filters'] = {
+    'asset_mac': ['icontains', 'iexact', 'istartswith', 'regex'],
+}
+
+CONFIG_GRAPHQL_MAX_DEPTH = deepcopy(settings.PLUGINS_CONFIG)
+CONFIG_GRAPHQL_MAX_DEPTH['netbox_inventory']['graphql_max_depth'] = 1
@@ -1,6 +1,6 @@
 from netbox.ui import attrs, panels
 
-from netbox_inventory.choices import AssetStatusChoices
+from netbox_inventory.analyzers import asset_counts_role_status
 from netbox_inventory.models import Asset
 
 
@@ -15,18 +15,8 @@ class AssetRoleStatusPanel(panels.Panel):
         ctx = super().get_context(context)
         instance = context.get('object')
         request = context.get('request')
-        assets = Asset.objects.restrict(request.user, 'view').filter(
-            role__in=instance.get_descendants(include_self=True)
-        )
-        status_counts = {
-            key: {
-                'value': key,
-                'label': label,
-                'color': AssetStatusChoices.colors[key],
-                'count': assets.filter(status=key).count(),
-            }
-            for key, label in list(AssetStatusChoices)
-        }
+        assets = Asset.objects.restrict(request.user, 'view')
+        status_counts = asset_counts_role_status(instance, assets)['status_counts']
         ctx['status_counts'] = status_counts
         return ctx
 
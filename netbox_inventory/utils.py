@@ -1,28 +1,147 @@
-from django.core.exceptions import ImproperlyConfigured
-from django.db.models import Q
-from django.db.models.signals import pre_save
+import hashlib
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
 
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ImproperlyConfigured
+from django.db import transaction
+from django.db.models import (
+    BigIntegerField,
+    F,
+    Model,
+    OuterRef,
+    Q,
+    Subquery,
+)
+from django.db.models.functions import Coalesce
+
+from core.choices import ObjectChangeActionChoices
+from core.models import ObjectChange, ObjectType
 from dcim.models import Device, InventoryItem, Module, Rack
+from extras.models import EventRule
+from netbox.config import get_config
+from netbox.context import current_request
 from netbox.plugins import get_plugin_config
+from utilities.exceptions import AbortRequest
 
 from .choices import AssetStatusChoices
 
+_prechange_batch = ContextVar('netbox_inventory_prechange_batch', default=None)
+
 
 def get_prechange_field(obj, field_name):
     """Get value from obj._prechange_snapshot. If field is a relation,
     return object instance.
+
+    Related instances are resolved once per snapshot and cached on obj, so
+    repeated calls from clean() and save() don't hit the database again.
+    Inside prechange_batch() they are taken from objects preloaded for the
+    whole batch.
     """
-    value = getattr(obj, '_prechange_snapshot', {}).get(field_name)
+    snapshot = getattr(obj, '_prechange_snapshot', {})
+    value = snapshot.get(field_name)
     if value is None:
         return None
     field = obj._meta.get_field(field_name)
-    if field.is_relation:
-        rel_obj = field.related_model.objects.filter(pk=value).first()
-        if rel_obj:
-            return rel_obj
+    if not field.is_relation:
+        return value
+    cached_snapshot, cache = getattr(obj, '_prechange_related', (None, None))
+    if cached_snapshot is not snapshot:
+        cache = {}
+        obj._prechange_related = (snapshot, cache)
+    if field_name not in cache:
+        batch = _prechange_batch.get()
+        preloaded = batch.get(field.related_model) if batch else None
+        if preloaded is not None and value in preloaded:
+            cache[field_name] = preloaded[value]
         else:
-            return None
-    return value
+            cache[field_name] = field.related_model.objects.filter(pk=value).first()
+    return cache[field_name]
+
+
+@contextmanager
+def prechange_batch(queryset, field_names):
+    """Preload related objects referenced by field_names for all objects in
+    queryset, so get_prechange_field() doesn't query them one by one.
+
+    Uses one query to collect related ids and one in_bulk() per related model.
+    """
+    fields = [queryset.model._meta.get_field(name) for name in field_names]
+    ids = {field.related_model: set() for field in fields}
+    for row in queryset.values_list(*[field.attname for field in fields]):
+        for field, value in zip(fields, row):
+            if value is not None:
+                ids[field.related_model].add(value)
+    batch = {
+        model: model.objects.in_bulk(pks) if pks else {}
+        for model, pks in ids.items()
+    }
+    token = _prechange_batch.set(batch)
+    try:
+        yield batch
+    finally:
+        _prechange_batch.reset(token)
+
+
+_import_lookups = ContextVar('netbox_inventory_import_lookups', default=None)
+
+
+@contextmanager
+def import_lookup_cache():
+    """
+    Cache related object lookups for the duration of an import, so that each
+    distinct (model, lookup) is resolved or created only once instead of once
+    per imported row. Failed lookups are not cached.
+
+    Yields the cache dict. It must be cleared if a savepoint that may have
+    created cached objects is rolled back.
+    """
+    cache = {}
+    token = _import_lookups.set(cache)
+    try:
+        yield cache
+    finally:
+        _import_lookups.reset(token)
+
+
+def import_cached(key, resolve):
+    """
+    Return result of resolve() for key from import lookup cache. If no import
+    is in progress, resolve() is always called.
+    """
+    cache = _import_lookups.get()
+    if cache is None:
+        return resolve()
+    if key not in cache:
+        cache[key] = resolve()
+    return cache[key]
+
+
+def _lookup_key(model, lookups):
+    key = []
+    for name, value in sorted(lookups.items()):
+        if isinstance(value, Model):
+            value = value.pk
+        elif name.endswith('__iexact') and isinstance(value, str):
+            # database compares UPPER() of both sides
+            value = value.upper()
+        key.append((name, value))
+    return (model, tuple(key))
+
+
+def cached_get(model, **lookups):
+    return import_cached(
+        ('get', *_lookup_key(model, lookups)),
+        lambda: model.objects.get(**lookups),
+    )
+
+
+def cached_get_or_create(model, defaults=None, **lookups):
+    return import_cached(
+        ('get_or_create', *_lookup_key(model, lookups)),
+        lambda: model.objects.get_or_create(defaults=defaults, **lookups),
+    )
 
 
 def get_plugin_setting(setting_name):
@@ -55,21 +174,86 @@ def get_all_statuses_for(status):
     return list(status_names)
 
 
+_serial_asset_tag_guard_suppressed = ContextVar(
+    'netbox_inventory_serial_asset_tag_guard_suppressed', default=False
+)
+
+
+@contextmanager
+def suppress_serial_asset_tag_guard():
+    """
+    Allow changing serial and asset tag of hardware with an asset assigned, in
+    the current context only. Unlike disconnecting the signal receiver, this
+    doesn't affect other threads or requests.
+    """
+    token = _serial_asset_tag_guard_suppressed.set(True)
+    try:
+        yield
+    finally:
+        _serial_asset_tag_guard_suppressed.reset(token)
+
+
+def serial_asset_tag_guard_suppressed():
+    return _serial_asset_tag_guard_suppressed.get()
+
+
+def serial_asset_tag_error(kind):
+    return AbortRequest(
+        f'Cannot change {kind} serial and asset tag if asset is assigned. Please update via inventory > asset instead.'
+    )
+
+
+def serial_asset_tag_changed(hw):
+    """
+    Return False if serial and asset tag of hw are the same as in its prechange
+    snapshot. Without a snapshot the change can't be ruled out, so returns True.
+    """
+    snapshot = getattr(hw, '_prechange_snapshot', None)
+    if snapshot is None:
+        return True
+    return not is_equal_none(snapshot.get('serial'), hw.serial) or not is_equal_none(
+        snapshot.get('asset_tag'), hw.asset_tag
+    )
+
+
+def validate_serial_asset_tag_batch(objects):
+    """
+    Check done by prevent_update_serial_asset_tag receiver for a batch of hardware
+    objects of the same model, with assigned assets of all objects looked up in a
+    single query. Raises AbortRequest if serial or asset tag of any object differs
+    from its assigned asset.
+
+    Objects can then be saved inside suppress_serial_asset_tag_guard(), so the
+    receiver doesn't repeat the check for each of them.
+    """
+    if not get_plugin_setting('sync_hardware_serial_asset_tag'):
+        return
+    objects = [obj for obj in objects if obj.pk]
+    if not objects:
+        return
+    model = type(objects[0])
+    assigned = {
+        pk: (serial, asset_tag)
+        for pk, serial, asset_tag in model.objects.filter(
+            pk__in=[obj.pk for obj in objects], assigned_asset__isnull=False
+        ).values_list('pk', 'assigned_asset__serial', 'assigned_asset__asset_tag')
+    }
+    for obj in objects:
+        if obj.pk not in assigned:
+            continue
+        serial, asset_tag = assigned[obj.pk]
+        if not is_equal_none(serial, obj.serial) or not is_equal_none(
+            asset_tag, obj.asset_tag
+        ):
+            raise serial_asset_tag_error(model._meta.model_name)
+
+
 def asset_clear_old_hw(old_hw):
-    # need to temporarily disconnect signal receiver that prevents update of device serial if asset assigned
-    from .signals import prevent_update_serial_asset_tag
-
-    pre_save.disconnect(prevent_update_serial_asset_tag, sender=Device)
-    pre_save.disconnect(prevent_update_serial_asset_tag, sender=Module)
-    pre_save.disconnect(prevent_update_serial_asset_tag, sender=InventoryItem)
-    pre_save.disconnect(prevent_update_serial_asset_tag, sender=Rack)
-    old_hw.serial = ''
-    old_hw.asset_tag = None
-    old_hw.save()
-    pre_save.connect(prevent_update_serial_asset_tag, sender=Device)
-    pre_save.connect(prevent_update_serial_asset_tag, sender=Module)
-    pre_save.connect(prevent_update_serial_asset_tag, sender=InventoryItem)
-    pre_save.connect(prevent_update_serial_asset_tag, sender=Rack)
+    # bypass the receiver that prevents update of device serial if asset assigned
+    with suppress_serial_asset_tag_guard():
+        old_hw.serial = ''
+        old_hw.asset_tag = None
+        old_hw.save()
 
 
 def asset_set_new_hw(asset, hw):
@@ -116,26 +300,222 @@ def is_equal_none(a, b):
     return a == b
 
 
+# Asset fields cleared when its hardware is deleted
+ASSET_INSTALLED_FIELDS = (
+    'installed_site',
+    'installed_location',
+    'installed_rack',
+    'installed_device',
+)
+
+
+def release_assigned_asset(collector, field, sub_objs, using):
+    """
+    on_delete handler of Asset hardware fields (device, module, inventoryitem,
+    rack). When hardware is deleted, unassign it from its asset and set asset
+    status to stored_status, if one is configured.
+
+    The hardware field is cleared as part of the deletion, like SET_NULL. Inside
+    a DB transaction, assets are only recorded and released together when the
+    transaction commits, since NetBox bulk delete views delete objects one by one.
+    Outside of a transaction, assets are released right away.
+    """
+    # collector has already loaded sub_objs, though it may have deferred fields
+    assets = list(sub_objs)
+    connection = transaction.get_connection(using)
+    if connection.in_atomic_block:
+        collector.add_field_update(field, None, assets)
+        _pending_asset_releases(field.model, using).add(field, assets)
+        return
+    if any(asset.get_deferred_fields() for asset in assets):
+        # snapshot needs all fields
+        assets = list(field.model.objects.filter(pk__in=[a.pk for a in assets]))
+    stored_status = get_status_for('stored')
+    if has_event_rules(field.model):
+        _save_released_assets(assets, field, stored_status)
+    else:
+        _bulk_release_assets(collector, field, assets, stored_status, using)
+
+
+class _PendingAssetReleases:
+    """
+    Assets whose hardware was deleted in current transaction, released together
+    with release_pending() once the transaction commits.
+    """
+
+    def __init__(self, model, using):
+        self.model = model
+        self.using = using
+        # asset pk: (hardware field attname, hardware pk)
+        self.hardware = {}
+
+    def add(self, field, assets):
+        for asset in assets:
+            self.hardware[asset.pk] = (field.attname, getattr(asset, field.attname))
+
+    def release_pending(self):
+        connection = transaction.get_connection(self.using)
+        if getattr(connection, '_netbox_inventory_releases', None) is self:
+            del connection._netbox_inventory_releases
+        with transaction.atomic(using=self.using):
+            _release_assets(self.model, self.hardware)
+
+
+def _pending_asset_releases(model, using):
+    """
+    Return releases pending on commit of current transaction on using, creating
+    them if there are none yet. Releases are kept on the connection, and are
+    discarded when their on_commit callback is, i.e. on rollback.
+    """
+    connection = transaction.get_connection(using)
+    pending = getattr(connection, '_netbox_inventory_releases', None)
+    if pending is None or not any(
+        func == pending.release_pending for _, func, *__ in connection.run_on_commit
+    ):
+        pending = _PendingAssetReleases(model, using)
+        connection._netbox_inventory_releases = pending
+        transaction.on_commit(pending.release_pending, using=using)
+    return pending
+
+
+def _release_assets(model, hardware):
+    """
+    Release assets in hardware (asset pk: (attname, hardware pk)) with one UPDATE
+    and bulk changelog, or save them one by one if there are event rules for
+    assets.
+    """
+    # skip deleted assets and those whose hardware deletion was rolled back
+    assets = [
+        asset
+        for asset in model.objects.filter(pk__in=hardware)
+        if getattr(asset, hardware[asset.pk][0]) is None
+    ]
+    if not assets:
+        return
+    stored_status = get_status_for('stored')
+    for asset in assets:
+        # changelog should show asset was assigned to the deleted hardware
+        attname, hardware_pk = hardware[asset.pk]
+        setattr(asset, attname, hardware_pk)
+        asset.snapshot()
+        setattr(asset, attname, None)
+    if has_event_rules(model):
+        for asset in assets:
+            if stored_status:
+                asset.status = stored_status
+            asset.full_clean()
+            asset.save(clear_old_hw=False)
+        return
+
+    values = dict.fromkeys(ASSET_INSTALLED_FIELDS)
+    if stored_status:
+        values['status'] = stored_status
+    for asset in assets:
+        for name, value in values.items():
+            setattr(asset, name, value)
+    pks = [asset.pk for asset in assets]
+    model.objects.filter(pk__in=pks).update(**values)
+    bulk_log_changes(assets, ObjectChangeActionChoices.ACTION_UPDATE)
+    invalidate_asset_stats()
+    if get_plugin_setting('asset_search_document'):
+        model.objects.filter(pk__in=pks).refresh_search_document()
+
+
+def _save_released_assets(assets, field, stored_status):
+    for asset in assets:
+        asset.snapshot()
+        if stored_status:
+            asset.status = stored_status
+        setattr(asset, field.attname, None)
+        asset.full_clean()
+        asset.save(clear_old_hw=False)
+
+
+def _bulk_release_assets(collector, field, assets, stored_status, using):
+    model = field.model
+    # asset is no longer installed anywhere once its hardware is gone
+    installed_fields = [model._meta.get_field(name) for name in ASSET_INSTALLED_FIELDS]
+    for asset in assets:
+        asset.snapshot()
+        setattr(asset, field.attname, None)
+        for installed_field in installed_fields:
+            setattr(asset, installed_field.attname, None)
+        if stored_status:
+            asset.status = stored_status
+    bulk_log_changes(assets, ObjectChangeActionChoices.ACTION_UPDATE)
+
+    for update_field in (field, *installed_fields):
+        collector.add_field_update(update_field, None, assets)
+    if stored_status:
+        status_field = model._meta.get_field('status')
+        collector.add_field_update(status_field, stored_status, assets)
+
+    pks = [asset.pk for asset in assets]
+
+    def released():
+        invalidate_asset_stats()
+        if get_plugin_setting('asset_search_document'):
+            model.objects.filter(pk__in=pks).refresh_search_document()
+
+    transaction.on_commit(released, using=using)
+
+
+def asset_refresh_installed(assets):
+    """
+    Recalculate installed_site, installed_location, installed_rack and
+    installed_device for all assets in queryset with a single UPDATE.
+    Returns number of updated assets.
+    """
+
+    def _hw_value(model, field_name, lookup):
+        return Subquery(
+            model.objects.filter(pk=OuterRef(field_name)).values(lookup)[:1]
+        )
+
+    def _installed(lookup, rack_lookup=None):
+        expressions = [
+            _hw_value(Device, 'device', lookup),
+            _hw_value(Module, 'module', f'device__{lookup}'),
+            _hw_value(InventoryItem, 'inventoryitem', f'device__{lookup}'),
+        ]
+        if rack_lookup:
+            expressions.append(_hw_value(Rack, 'rack', rack_lookup))
+        return Coalesce(*expressions, output_field=BigIntegerField())
+
+    return assets.update(
+        installed_site=_installed('site', 'site'),
+        installed_location=_installed('location', 'location'),
+        installed_rack=_installed('rack', 'pk'),
+        installed_device=Coalesce(
+            F('device'),
+            _hw_value(Module, 'module', 'device'),
+            _hw_value(InventoryItem, 'inventoryitem', 'device'),
+            output_field=BigIntegerField(),
+        ),
+    )
+
+
 def query_located(queryset, field_name, values, assets_shown='all'):
     """
     Filters queryset on located values. Can filter for installed
     location/site and/or stored location/site for assets makred as stored.
+    Installed location is read from denormalized installed_* fields on Asset.
     Args:
         * queryset - queryset of Asset model
-        * field_name - 'site' or 'location' or 'rack'
+        * field_name - 'site' or 'location' or 'rack' (or a lookup on them,
+          like 'site__slug')
         * values - list of PKs of location types to filter on
         * assets_shown - 'all' or 'installed' or 'stored'
     """
-    if field_name == 'rack':
-        q_installed = Q(**{'rack__in': values})
-    else:
-        q_installed = Q(**{f'rack__{field_name}__in': values})
-    q_installed = (
-        q_installed
-        | Q(**{f'device__{field_name}__in': values})
-        | Q(**{f'module__device__{field_name}__in': values})
-        | Q(**{f'inventoryitem__device__{field_name}__in': values})
-    )
+    return queryset.filter(located_q(field_name, values, assets_shown))
+
+
+def located_q(field_name, values, assets_shown='all'):
+    """
+    Return Q expression used by query_located(). Can be used as filter on
+    aggregates to count installed and stored assets in one query.
+    """
+    q_installed = Q(**{f'installed_{field_name}__in': values})
 
     # Q expressions for stored
     if field_name == 'rack':
@@ -152,14 +532,55 @@ def query_located(queryset, field_name, values, assets_shown='all'):
         )
 
     if assets_shown == 'all':
-        q = q_installed | q_stored
+        return q_installed | q_stored
     elif assets_shown == 'installed':
-        q = q_installed
+        return q_installed
     elif assets_shown == 'stored':
-        q = q_stored
+        return q_stored
     else:
         raise Exception('unsupported')
-    return queryset.filter(q)
+
+
+ASSET_STATS_VERSION_KEY = 'netbox_inventory:asset_stats:version'
+
+
+def cached_asset_stats(name, obj, queryset, compute):
+    """
+    Return compute() for asset statistics panel `name` of obj, cached for
+    `asset_stats_cache_timeout` seconds if that setting is enabled.
+
+    queryset is the Asset queryset restricted for current user. Its SQL is part
+    of cache key, so users with different permission constraints don't share
+    cached values. Cached values are dropped on any asset change, see
+    invalidate_asset_stats().
+    """
+    timeout = get_plugin_setting('asset_stats_cache_timeout')
+    if not timeout:
+        return compute()
+    try:
+        restriction = str(queryset.query)
+    except EmptyResultSet:
+        restriction = ''
+    version = cache.get_or_set(
+        ASSET_STATS_VERSION_KEY, lambda: uuid.uuid4().hex, None
+    )
+    key = 'netbox_inventory:asset_stats:{}:{}:{}:{}:{}'.format(
+        version,
+        name,
+        obj._meta.label_lower,
+        obj.pk,
+        hashlib.sha256(restriction.encode()).hexdigest(),
+    )
+    return cache.get_or_set(key, compute, timeout)
+
+
+def invalidate_asset_stats():
+    """
+    Invalidate all cached asset statistics by changing cache key version.
+    """
+    if not get_plugin_setting('asset_stats_cache_timeout'):
+        return
+    cache.set(ASSET_STATS_VERSION_KEY, uuid.uuid4().hex, None)
 
 
 def get_asset_custom_fields_search_filters():
@@ -178,3 +599,66 @@ def get_asset_custom_fields_search_filters():
         for filter in filters:
             fields.append(f'custom_field_data__{field_name}__{filter}')
     return fields
+
+
+def file_sha256(file):
+    """
+    Return hex sha256 digest of file contents, read in chunks. File is rewound
+    afterwards.
+    """
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(64 * 1024), b''):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def has_custom_validators(model):
+    """
+    Return True if CUSTOM_VALIDATORS are configured for model. Such validators
+    may depend on individual field values and must run per object.
+    """
+    key = f'{model._meta.app_label}.{model._meta.model_name}'
+    return bool(get_config().CUSTOM_VALIDATORS.get(key))
+
+
+def has_event_rules(model):
+    """
+    Return True if any enabled event rule is bound to model. Events are only
+    enqueued from the post_save/post_delete handlers.
+    """
+    return EventRule.objects.filter(
+        enabled=True,
+        object_types=ObjectType.objects.get_for_model(model),
+    ).exists()
+
+
+def bulk_log_changes(objects, action):
+    """
+    Write ObjectChange records for objects in one query. Used where objects are
+    written with bulk_create() or update() and NetBox's changelog signal handlers
+    don't run. For updates, objects must have a snapshot taken before the change;
+    objects without any change are skipped.
+    """
+    request = current_request.get()
+    user = getattr(request, 'user', None)
+    if user is not None and not user.is_authenticated:
+        user = None
+    request_id = getattr(request, 'id', None) or uuid.uuid4()
+
+    objectchanges = []
+    for obj in objects:
+        objectchange = obj.to_objectchange(action)
+        if objectchange is None:
+            continue
+        if (
+            action == ObjectChangeActionChoices.ACTION_UPDATE
+            and not objectchange.has_changes
+        ):
+            continue
+        objectchange.user = user
+        objectchange.user_name = user.username if user else ''
+        objectchange.request_id = request_id
+        objectchanges.append(objectchange)
+    return ObjectChange.objects.bulk_create(objectchanges)
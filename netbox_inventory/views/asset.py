@@ -1,11 +1,37 @@
+from django.contrib import messages
+from django.contrib.contenttypes.models import ContentType
 from django.db import IntegrityError
+from django.db.models import prefetch_related_objects
+from django.shortcuts import redirect, render
 from django.template import Template
+from django.utils.translation import gettext_lazy as _
+from django.views.generic import View
 
+from core.choices import ObjectChangeActionChoices
+from extras.models import TaggedItem
+from netbox.search.backends import search_backend
 from netbox.views import generic
-from utilities.views import register_model_view
+from utilities.request import copy_safe_request
+from utilities.views import (
+    GetReturnURLMixin,
+    ObjectPermissionRequiredMixin,
+    register_model_view,
+)
 
 from .. import filtersets, forms, models, tables
+from ..choices import HardwareKindChoices
+from ..constants import BULK_CREATE_BATCH_SIZE
+from ..jobs import AssetImportJob
 from ..template_content import WARRANTY_PROGRESSBAR
+from ..utils import (
+    bulk_log_changes,
+    get_plugin_setting,
+    has_custom_validators,
+    has_event_rules,
+    import_lookup_cache,
+    invalidate_asset_stats,
+    prechange_batch,
+)
 
 __all__ = (
     'AssetView',
@@ -14,6 +40,7 @@ __all__ = (
     'AssetEditView',
     'AssetDeleteView',
     'AssetBulkImportView',
+    'AssetImportJobView',
     'AssetBulkEditView',
     'AssetBulkDeleteView',
 )
@@ -45,6 +72,10 @@ class AssetListView(generic.ObjectListView):
         'purchase__supplier',
         'delivery',
         'storage_location',
+        'installed_site',
+        'installed_location',
+        'installed_rack',
+        'installed_device',
     )
     table = tables.AssetTable
     filterset = filtersets.AssetFilterSet
@@ -62,14 +93,92 @@ class AssetBulkCreateView(generic.BulkCreateView):
     def _create_objects(self, form, request):
         pattern_values = form.cleaned_data.get('pattern')
 
-        if pattern_values:
-            return self._create_objects_by_tag_pattern(form, request, pattern_values)
+        if has_custom_validators(models.Asset) or has_event_rules(models.Asset):
+            # custom validators and event rules must see each object on its own
+            if pattern_values:
+                return self._create_objects_by_tag_pattern(
+                    form, request, pattern_values
+                )
+            return self._create_objects_by_count(
+                form, request, form.cleaned_data['count']
+            )
+
+        asset_tags = pattern_values or [None] * form.cleaned_data['count']
+        return self._bulk_create_objects(form, request, asset_tags)
+
+    def _bulk_create_objects(self, form, request, asset_tags):
+        """
+        Validate shared field values once, then insert all assets with
+        bulk_create() and write their tags, search cache and changelog in bulk.
+        """
+        model_form = self.model_form(request.POST.copy())
+        del model_form.data['count']
+        model_form.data.pop('pattern', None)
+        if not model_form.is_valid():
+            # Raise an IntegrityError to abort the transaction.
+            raise IntegrityError()
+        template = model_form.instance
+        template.update_kind()
+
+        if any(asset_tags):
+            existing = sorted(
+                models.Asset.objects.filter(
+                    owning_tenant=template.owning_tenant,
+                    asset_tag__in=asset_tags,
+                ).values_list('asset_tag', flat=True)
+            )
+            if existing:
+                form.add_error(
+                    'pattern',
+                    f'Assets with asset tag {", ".join(existing)} already exist.',
+                )
+                raise IntegrityError()
+            if len(set(asset_tags)) != len(asset_tags):
+                form.add_error('pattern', 'Pattern expands to duplicate asset tags.')
+                raise IntegrityError()
+
+        fields = [f for f in models.Asset._meta.concrete_fields if not f.primary_key]
+        new_objects = []
+        for asset_tag in asset_tags:
+            obj = models.Asset(
+                **{f.attname: getattr(template, f.attname) for f in fields}
+            )
+            obj.custom_field_data = dict(template.custom_field_data)
+            obj.asset_tag = asset_tag
+            new_objects.append(obj)
+        models.Asset.objects.bulk_create(
+            new_objects, batch_size=BULK_CREATE_BATCH_SIZE
+        )
+
+        if tags := model_form.cleaned_data.get('tags'):
+            content_type = ContentType.objects.get_for_model(models.Asset)
+            TaggedItem.objects.bulk_create(
+                [
+                    TaggedItem(tag=tag, content_type=content_type, object_id=obj.pk)
+                    for obj in new_objects
+                    for tag in tags
+                ],
+                batch_size=BULK_CREATE_BATCH_SIZE,
+            )
+        prefetch_related_objects(new_objects, 'tags')
+
+        search_backend.cache(new_objects, remove_existing=False)
+        bulk_log_changes(new_objects, ObjectChangeActionChoices.ACTION_CREATE)
+        # post_save isn't sent by bulk_create()
+        models.LocationAssetCount.objects.adjust(
+            template.storage_location_id, len(new_objects)
+        )
+        if get_plugin_setting('asset_search_document'):
+            models.Asset.objects.filter(
+                pk__in=[obj.pk for obj in new_objects]
+            ).refresh_search_document()
+        invalidate_asset_stats()
 
-        return self._create_objects_by_count(form, request, form.cleaned_data['count'])
+        return new_objects
 
     def _create_objects_by_count(self, form, request, count):
         new_objects = []
-        for _ in range(count):
+        for __ in range(count):
             # Reinstantiate the model form each time to avoid overwriting the same instance. Use a mutable
             # copy of the POST QueryDict so that we can update the target field value.
             model_form = self.model_form(request.POST.copy())
@@ -127,6 +236,70 @@ class AssetBulkImportView(generic.BulkImportView):
     model_form = forms.AssetImportForm
     template_name = 'netbox_inventory/asset_bulk_import.html'
 
+    def create_and_update_objects(self, form, request):
+        # resolve related objects shared between rows only once
+        with import_lookup_cache():
+            return super().create_and_update_objects(form, request)
+
+
+@register_model_view(
+    models.Asset, 'import_job', path='import/background', detail=False
+)
+class AssetImportJobView(GetReturnURLMixin, ObjectPermissionRequiredMixin, View):
+    """
+    Import assets in a background job, committing rows in chunks.
+    """
+
+    queryset = models.Asset.objects.all()
+    template_name = 'netbox_inventory/asset_import_job.html'
+
+    def get_required_permission(self):
+        return 'netbox_inventory.add_asset'
+
+    def _get_form(self, request):
+        form = forms.AssetImportJobForm(request.POST or None, request.FILES or None)
+        form.fields['resume_job'].queryset = form.fields[
+            'resume_job'
+        ].queryset.filter(user=request.user)
+        return form
+
+    def get(self, request):
+        return render(
+            request,
+            self.template_name,
+            {
+                'form': self._get_form(request),
+                'return_url': self.get_return_url(request),
+            },
+        )
+
+    def post(self, request):
+        form = self._get_form(request)
+        if not form.is_valid():
+            return render(
+                request,
+                self.template_name,
+                {
+                    'form': form,
+                    'return_url': self.get_return_url(request),
+                },
+            )
+
+        resume_job = form.cleaned_data['resume_job']
+        job = AssetImportJob.enqueue(
+            user=request.user,
+            data_file=form.save_data_file(),
+            format=form.cleaned_data['format'],
+            chunk_size=form.cleaned_data['chunk_size'],
+            resume_job_id=resume_job.pk if resume_job else None,
+            request=copy_safe_request(request),
+        )
+        messages.info(
+            request,
+            _('Asset import queued as job {job}').format(job=job.pk),
+        )
+        return redirect(job.get_absolute_url())
+
 
 @register_model_view(models.Asset, 'bulk_edit', path='edit', detail=False)
 class AssetBulkEditView(generic.BulkEditView):
@@ -135,6 +308,12 @@ class AssetBulkEditView(generic.BulkEditView):
     table = tables.AssetTable
     form = forms.AssetBulkEditForm
 
+    def _update_objects(self, form, request):
+        # resolve previously assigned hardware for all edited assets at once
+        queryset = self.queryset.filter(pk__in=form.cleaned_data['pk'])
+        with prechange_batch(queryset, HardwareKindChoices.values()):
+            return super()._update_objects(form, request)
+
 
 @register_model_view(models.Asset, 'bulk_delete', path='delete', detail=False)
 class AssetBulkDeleteView(generic.BulkDeleteView):
@@ -211,14 +211,16 @@ class AuditFlowRunView(generic.ObjectChildrenView):
             minutes=get_plugin_config('netbox_inventory', 'audit_window'),
         )
 
+        # Look up the latest audit trail of each object in AuditLastSeen, which has
+        # at most one row per object, instead of searching the audit trail history.
         object_type = ObjectType.objects.get_for_model(self.child_model)
         return queryset.annotate(
             audit_trail=Subquery(
-                models.AuditTrail.objects.filter(
+                models.AuditLastSeen.objects.filter(
                     object_type=object_type,
                     object_id=OuterRef('pk'),
                     created__gte=timeframe,
-                ).values('id')[:1]
+                ).values('audit_trail_id')[:1]
             ),
         )
 
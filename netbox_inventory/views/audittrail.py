@@ -1,5 +1,4 @@
 from django.contrib import messages
-from django.db import transaction
 from django.db.models import Model, QuerySet
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
@@ -63,13 +62,13 @@ class AuditTrailBulkAddView(GetReturnURLMixin, ObjectPermissionRequiredMixin, Vi
         )
         model = object_type.model_class()
 
-        with transaction.atomic():
-            count = 0
+        audit_trails = models.AuditTrail.objects.bulk_create_logged(
+            models.AuditTrail(object=obj)
             for obj in model.objects.filter(
                 pk__in=request.POST.getlist('pk'),
-            ):
-                models.AuditTrail.objects.create(object=obj)
-                count += 1
+            )
+        )
+        count = len(audit_trails)
 
         if count > 0:
             messages.success(
@@ -107,12 +106,24 @@ class ObjectAuditTrailView(ConditionalLoginRequiredMixin, View):
 
     tab = ViewTab(
         label=_('Audit'),
-        badge=lambda obj: ObjectAuditTrailView.get_audit_trails(obj).count(),
+        badge=lambda obj: ObjectAuditTrailView.get_audit_trail_count(obj),
         permission='netbox_inventory.view_audittrail',
         weight=4000,
         hide_if_empty=True,
     )
 
+    @staticmethod
+    def get_audit_trail_count(obj: Model) -> int:
+        return (
+            models.AuditLastSeen.objects.filter(
+                object_type=ObjectType.objects.get_for_model(obj),
+                object_id=obj.pk,
+            )
+            .values_list('count', flat=True)
+            .first()
+            or 0
+        )
+
     @staticmethod
     def get_audit_trails(obj: Model) -> QuerySet:
         return models.AuditTrail.objects.filter(